@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['six', 'pkg_resources', 'appdirs', 'packaging', 'pyparsing', 'setuptools', 'markupsafe'],
+    hiddenimports=['six', 'pkg_resources', 'appdirs', 'packaging', 'pyparsing', 'setuptools', 'markupsafe', 'h2'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
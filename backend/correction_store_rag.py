@@ -1,67 +1,237 @@
+import hashlib
 import json
 import os
-from typing import Dict, Any, Optional
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 
 import chromadb
+import torch
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from dotenv import load_dotenv
+
+from .env import load_env
+from .text_utils import canonicalize
 
 # Load backend-specific .env first (backend/.env), then fall back to defaults
-try:
-    _here_env = os.path.join(os.path.dirname(__file__), ".env")
-    if os.path.exists(_here_env):
-        load_dotenv(_here_env)
-    else:
-        load_dotenv()
-except Exception:
-    load_dotenv()
+load_env()
 
 RAG_DB_DIR = os.getenv("RAG_DB_DIR", "rag_corrections_db")
+EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+# Cosine distance under which a cached LLM answer is reused (~0.9 similarity)
+RESPONSE_CACHE_MAX_DISTANCE = 0.1
+# Correction keys persisted per document (one metadata column each)
+CORRECTION_FIELDS = ("doc_type", "doc_subtype")
+# Exact-repeat query results kept in memory per store
+QUERY_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=1)
+def _get_embedder() -> SentenceTransformer:
+    """Load the sentence encoder once and share it between stores.
+
+    Runs in FP16 on CUDA when a GPU is available, FP32 on CPU otherwise.
+    """
+    if torch.cuda.is_available():
+        return SentenceTransformer(EMBED_MODEL_NAME, device="cuda").half()
+    return SentenceTransformer(EMBED_MODEL_NAME)
+
+
+def _metadata_to_correction(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    if "correction" in metadata:
+        # Rows saved before corrections were flattened hold a JSON blob
+        correction_str = metadata["correction"]
+        return json.loads(correction_str) if correction_str else {}
+    return {k: metadata.get(k, "") for k in CORRECTION_FIELDS}
+
+
+def _doc_id(text: str) -> str:
+    """Stable content hash used as the Chroma id (unlike the salted builtin hash())."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _get_client(db_dir: str):
+    """Open one persistent Chroma client per directory for the process lifetime."""
+    return chromadb.PersistentClient(path=db_dir)
+
 
 class RAGCorrectionStore:
     def __init__(self, persist_dir: Optional[str] = None):
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.model = _get_embedder()
         db_dir = persist_dir or RAG_DB_DIR
-        self.client = chromadb.PersistentClient(path=db_dir)
+        self.client = _get_client(db_dir)
         self.collection = self.client.get_or_create_collection("corrections")
+        # (doc id, threshold, top_k) -> correction; cleared whenever a correction is saved
+        self._query_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._query_cache_gen = 0
+        self._batcher = BatchingQueryService(self)
 
     def _embed(self, text: str):
-        return self.model.encode([text])[0].tolist()
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """Embed several documents in one forward pass per batch."""
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return embeddings.tolist()
 
     def add(self, doc_text: str, correction: Dict[str, Any]):
+        doc_text = canonicalize(doc_text)
         embedding = self._embed(doc_text)
-        self.collection.add(
+        # Same text -> same id across runs, so re-saving updates the row.
+        # Corrections are stored as scalar columns so queries need no JSON decode.
+        self.collection.upsert(
             embeddings=[embedding],
             documents=[doc_text],
-            metadatas=[{"correction": json.dumps(correction)}],  # <-- fixed
-            ids=[str(abs(hash(doc_text)))],
+            metadatas=[{k: correction.get(k) or "" for k in CORRECTION_FIELDS}],
+            ids=[_doc_id(doc_text)],
         )
+        with self._query_cache_lock:
+            self._query_cache.clear()
+            self._query_cache_gen += 1
 
     def query(self, doc_text: str, threshold=0.85, top_k=1) -> Dict[str, Any]:
-        embedding = self._embed(doc_text)
+        doc_text = canonicalize(doc_text)
+        key = (_doc_id(doc_text), threshold, top_k)
+        with self._query_cache_lock:
+            if key in self._query_cache:
+                self._query_cache.move_to_end(key)
+                return dict(self._query_cache[key])
+            gen = self._query_cache_gen
+        correction = self._query_uncached(doc_text, threshold, top_k)
+        with self._query_cache_lock:
+            # Skip caching if a correction was saved while we were querying
+            if gen == self._query_cache_gen:
+                self._query_cache[key] = correction
+                if len(self._query_cache) > QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+        return dict(correction)
+
+    def _query_uncached(self, doc_text: str, threshold: float, top_k: int) -> Dict[str, Any]:
+        metadatas, distances = self._batcher.submit(doc_text, top_k).result()
+        if metadatas and distances:
+            distance = distances[0]
+            if distance < (1 - threshold):  # cosine similarity, lower is better
+                return _metadata_to_correction(metadatas[0])
+        return {}
+
+
+class BatchingQueryService:
+    """Coalesce concurrent correction lookups into one encode and one Chroma query.
+
+    Request threads submit documents; a background thread waits up to
+    `window` seconds for more, embeds the batch in one pass, queries the
+    collection once and resolves each caller's future with its own row.
+    """
+
+    def __init__(self, store: RAGCorrectionStore, max_batch: int = 32, window: float = 0.01):
+        self._store = store
+        self._max_batch = max_batch
+        self._window = window
+        self._queue: "queue.Queue[tuple[str, int, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="rag-query-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, doc_text: str, top_k: int = 1) -> Future:
+        """Queue a lookup; the future yields (metadatas, distances) for the top_k hits."""
+        fut: Future = Future()
+        self._queue.put((doc_text, top_k, fut))
+        return fut
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            embeddings = self._store.encode_batch([doc_text for doc_text, _, _ in batch])
+            results = self._store.collection.query(
+                query_embeddings=embeddings,
+                n_results=max(top_k for _, top_k, _ in batch),
+                include=["metadatas", "distances"],
+            )
+        except Exception as e:
+            for _, _, fut in batch:
+                fut.set_exception(e)
+            return
+        for i, (_, top_k, fut) in enumerate(batch):
+            fut.set_result((results["metadatas"][i][:top_k], results["distances"][i][:top_k]))
+
+@lru_cache(maxsize=1)
+def get_store() -> RAGCorrectionStore:
+    """Return the process-wide correction store (built on first use)."""
+    return RAGCorrectionStore()
+
+
+class ResponseCacheStore:
+    """Semantic cache of LLM answers keyed by document embedding.
+
+    Near-duplicate faxes (same sender template, same lab header) reuse the
+    stored answer for an agent instead of calling the model again.
+    """
+
+    def __init__(self, persist_dir: Optional[str] = None,
+                 max_distance: float = RESPONSE_CACHE_MAX_DISTANCE):
+        self.model = _get_embedder()
+        db_dir = persist_dir or RAG_DB_DIR
+        self.client = _get_client(db_dir)
+        self.collection = self.client.get_or_create_collection(
+            "llm_responses", metadata={"hnsw:space": "cosine"}
+        )
+        self.max_distance = max_distance
+
+    def embed(self, text: str) -> List[float]:
+        return self.model.encode([text])[0].tolist()
+
+    def get(self, agent: str, embedding: List[float]) -> Optional[str]:
         results = self.collection.query(
             query_embeddings=[embedding],
-            n_results=top_k,
+            n_results=1,
+            where={"agent": agent},
             include=["metadatas", "distances"],
         )
-        if results["metadatas"] and results["distances"][0]:
-            distance = results["distances"][0][0]
-            if distance < (1 - threshold):  # cosine similarity, lower is better
-                correction_str = results["metadatas"][0][0]["correction"]
-                return json.loads(correction_str) if correction_str else {}
-        return {}
+        if results["metadatas"] and results["metadatas"][0]:
+            if results["distances"][0][0] < self.max_distance:
+                return results["metadatas"][0][0]["result"]
+        return None
+
+    def put(self, agent: str, doc_text: str, embedding: List[float], result: str):
+        self.collection.upsert(
+            embeddings=[embedding],
+            metadatas=[{"agent": agent, "result": result}],
+            ids=[f"{agent}:{_doc_id(doc_text)}"],
+        )
 
 # For direct demo/testing
 if __name__ == "__main__":
     store = RAGCorrectionStore()
     # 1. Two different patients, two corrections
     doc1 = "FAX: John Doe, DOB 1990-01-01, seen by Dr. Fazal. Discharge summary included."
-    correction1 = {"provider_name": "Dr. Smith", "comment": "Specialist follow-up required."}
+    correction1 = {"doc_type": "Hospital", "doc_subtype": "St. Mary Medical Center"}
     store.add(doc1, correction1)
 
     doc2 = "FAX: Jane Smith, DOB 1985-05-21, seen by Dr. Johnson. Referral for imaging."
-    correction2 = {"provider_name": "Dr. Taylor", "comment": "Imaging appointment needed."}
+    correction2 = {"doc_type": "Referral", "doc_subtype": "Johnson Family Practice"}
     store.add(doc2, correction2)
 
     # 2. Query with exact texts
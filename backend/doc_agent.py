@@ -1,48 +1,151 @@
+import os
+
+# Keep each Tesseract single-threaded; parallelism comes from the page workers.
+# Must be set before Tesseract is loaded in this process or its children.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+import multiprocessing
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+import pypdfium2
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
 from docling.datamodel.base_models import InputFormat
 from docling.datamodel.pipeline_options import (
-    PdfPipelineOptions, TesseractCliOcrOptions,
+    PdfPipelineOptions, TesseractOcrOptions,
 )
-from docling_core.types.doc import PictureItem
+from docling_core.utils.file import resolve_source_to_path
 
+# Number of page-conversion worker processes. Each one loads its own copy of
+# docling's layout/table models and a Tesseract instance, so memory grows per
+# worker; stay small by default and let OCR_WORKERS raise it on big hosts.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", min(2, os.cpu_count() or 1)))
 
-def convert_document(url):
+_worker_converter = None
+
+
+def _build_converter() -> DocumentConverter:
     pipeline_options = PdfPipelineOptions()
     pipeline_options.do_ocr = True
     pipeline_options.do_table_structure = True
     pipeline_options.table_structure_options.do_cell_matching = True
-    pipeline_options.ocr_options.lang = ["eng"]
-    pipeline_options.ocr_options = TesseractCliOcrOptions()
+    # In-process libtesseract (tesserocr); TESSDATA_PREFIX should point at tessdata_fast
+    pipeline_options.ocr_options = TesseractOcrOptions(
+        lang=["eng"], path=os.getenv("TESSDATA_PREFIX")
+    )
     pipeline_options.accelerator_options = AcceleratorOptions(
-        num_threads=4, device=AcceleratorDevice.AUTO
+        num_threads=1, device=AcceleratorDevice.AUTO
     )
-    pipeline_options.ocr_options.tesseract_cmd = 'tesseract'
-    doc_converter = DocumentConverter(
+    return DocumentConverter(
         format_options={
             InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
         }
     )
-    source = url
-    conv_res = doc_converter.convert(source)
+
+
+def _init_worker():
+    # Build the converter (and load its models) once per worker process
+    global _worker_converter
+    _worker_converter = _build_converter()
+
+
+def _convert_pages(path: str, first: int, last: int):
+    """Worker: convert pages first..last (1-based, inclusive) and return the document."""
+    conv_res = _worker_converter.convert(path, page_range=(first, last))
+    return conv_res.document
+
+
+@lru_cache(maxsize=1)
+def _get_pool() -> ProcessPoolExecutor:
+    # spawn: forking a server process that already holds model/BLAS threads is unsafe
+    return ProcessPoolExecutor(
+        max_workers=OCR_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+def log_ocr_simd() -> None:
+    """Print the SIMD paths (AVX2/FMA/NEON...) the installed Tesseract detected.
+
+    `tesseract --version` links the same libtesseract used in-process and
+    lists the instruction sets its LSTM dot-product kernels will use.
+    """
+    exe = shutil.which("tesseract")
+    if not exe:
+        print("Tesseract CLI not found; cannot report OCR SIMD support.")
+        return
+    try:
+        out = subprocess.run([exe, "--version"], capture_output=True, text=True, timeout=10)
+    except Exception as e:
+        print(f"Could not query Tesseract version: {e}")
+        return
+    lines = (out.stdout + out.stderr).splitlines()
+    found = [ln.strip() for ln in lines if ln.strip().startswith("Found ")]
+    version = lines[0].strip() if lines else "tesseract (unknown version)"
+    print(f"{version}; SIMD: {', '.join(found) or 'none detected (generic kernels)'}")
+
+
+def _save_picture(picture, document, path: Path) -> None:
+    image = picture.get_image(document)
+    if image is not None:
+        with path.open("wb") as fp:
+            image.save(fp, "PNG")
+    else:
+        print(f"Warning: Skipped a PictureItem—no image extracted for {path}")
+
+
+def _export_pictures(docs, output_dir: Path, doc_filename: str) -> None:
+    """Write every picture as PNG, numbered across pages, on a small thread pool."""
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = []
+        picture_counter = 0
+        for document in docs:
+            for picture in document.pictures:
+                picture_counter += 1
+                path = output_dir / f"{doc_filename}-picture-{picture_counter}.png"
+                futures.append(pool.submit(_save_picture, picture, document, path))
+        for fut in futures:
+            fut.result()
+
+
+def _page_count(path: Path) -> int:
+    pdf = pypdfium2.PdfDocument(str(path))
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def convert_document(url):
+    with tempfile.TemporaryDirectory() as workdir:
+        source = resolve_source_to_path(url, workdir=Path(workdir))
+        try:
+            n_pages = _page_count(source)
+        except Exception:
+            n_pages = 0  # not a PDF docling can split; convert it whole
+        if n_pages:
+            ranges = [(page, page) for page in range(1, n_pages + 1)]
+        else:
+            ranges = [(1, sys.maxsize)]
+        # One task per page; map() keeps results in page order
+        docs = list(_get_pool().map(
+            _convert_pages,
+            [str(source)] * len(ranges),
+            [first for first, _ in ranges],
+            [last for _, last in ranges],
+        ))
 
     output_dir = Path("scratch")
     output_dir.mkdir(parents=True, exist_ok=True)
-    doc_filename = conv_res.input.file.stem
-
-    picture_counter = 0
-    for element, _level in conv_res.document.iterate_items():
-        if isinstance(element, PictureItem):
-            picture_counter += 1
-            element_image_filename = output_dir / f"{doc_filename}-picture-{picture_counter}.png"
-            image = element.get_image(conv_res.document)
-            if image is not None:
-                with element_image_filename.open("wb") as fp:
-                    image.save(fp, "PNG")
-            else:
-                print(f"Warning: Skipped a PictureItem—no image extracted for {element_image_filename}")
-
-    return conv_res.document.export_to_markdown()
+    doc_filename = source.stem
+
+    _export_pictures(docs, output_dir, doc_filename)
 
+    return "\n\n".join(document.export_to_markdown() for document in docs)
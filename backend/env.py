@@ -0,0 +1,29 @@
+import os
+from functools import lru_cache
+
+from dotenv import dotenv_values, find_dotenv
+
+
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """Load backend/.env (or the nearest .env) into os.environ once per process.
+
+    Like load_dotenv, variables already set in the environment win.
+    """
+    here_env = os.path.join(os.path.dirname(__file__), ".env")
+    path = here_env if os.path.exists(here_env) else find_dotenv()
+    if not path:
+        return
+    # Older builds left a plaintext copy of the parsed secrets next to .env
+    try:
+        os.remove(f"{path}.cache")
+    except OSError:
+        pass
+    try:
+        values = dotenv_values(path)
+    except Exception as e:
+        print(f"Could not load {path}: {e}")
+        return
+    for key, value in values.items():
+        if value is not None:
+            os.environ.setdefault(key, value)
@@ -0,0 +1,52 @@
+"""
+Gzip request bodies for FastAPI routes.
+
+Clients send large uploads with Content-Encoding: gzip; GzipRoute gunzips them
+before FastAPI parses the body, with a cap on the inflated size.
+"""
+
+import zlib
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+
+# Largest request body accepted after gunzipping; fax text is far below this.
+# Bounds gzip bombs, where a few KB on the wire inflate to gigabytes.
+MAX_DECOMPRESSED_BYTES = 32 * 1024 * 1024
+
+
+def _gunzip_capped(body: bytes, limit: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)  # 16+: expect a gzip header
+    try:
+        out = d.decompress(body, limit)
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid gzip body: {e}")
+    # Output stopped at the cap with more to come: either input is left over,
+    # or zlib still holds pending output and only the stream end is missing
+    if d.unconsumed_tail or (len(out) >= limit and not d.eof):
+        raise HTTPException(status_code=413, detail=f"Decompressed body exceeds {limit} bytes")
+    if not d.eof:
+        raise HTTPException(status_code=400, detail="Invalid gzip body: truncated stream")
+    return out
+
+
+class GzipRequest(Request):
+    """Request whose body is transparently gunzipped when sent with Content-Encoding: gzip."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            if "gzip" in self.headers.getlist("Content-Encoding"):
+                body = _gunzip_capped(body)
+            self._body = body
+        return self._body
+
+
+class GzipRoute(APIRoute):
+    def get_route_handler(self):
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await original_route_handler(GzipRequest(request.scope, request.receive))
+
+        return route_handler
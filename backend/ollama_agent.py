@@ -1,58 +1,90 @@
-import json
 import re
 from datetime import datetime
+from enum import Enum
+from functools import lru_cache
 from pydantic import BaseModel
 import os
-from dotenv import load_dotenv
 from openai import OpenAI
+import orjson
+
+from .env import load_env
 
 # Load backend-specific .env first (backend/.env), then fall back to defaults
-try:
-    _here_env = os.path.join(os.path.dirname(__file__), ".env")
-    if os.path.exists(_here_env):
-        load_dotenv(_here_env)
-    else:
-        load_dotenv()
-except Exception:
-    load_dotenv()
+load_env()
 client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
 
 MODEL_NAME = "gpt-4.1"
 
+# Characters of the document each agent sees. The sender sits in the header and
+# patient/provider details on the first page; the comments agent reads it all.
+SENDER_CHAR_BUDGET = 2000
+EXTRACT_CHAR_BUDGET = 4000
+DOCTYPE_CHAR_BUDGET = 6000
+
+_DOB_US = re.compile(r'^(0[1-9]|1[0-2])/(0[1-9]|[12]\d|3[01])/\d{4}$')
+_DOB_FORMATS = ("%d %b %Y", "%d %B %Y", "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y")
+
 class DocumentInformation(BaseModel):
     patient_name: str
     date_of_birth: str
     provider_name: str
 
 
-def openai(messages, response_text):
-    if response_text:
-        completion = client.chat.completions.parse(
-            model=MODEL_NAME,
-            messages=messages,
-            response_format=response_text,
-        )
-    else:
-        completion = client.chat.completions.parse(
-            model=MODEL_NAME,
-            messages=messages,
-        )
-    return completion.choices[0].message
+class DocType(str, Enum):
+    """Document types offered by talkEHR; the doctype agent must pick one."""
+    LAB_IMAGING_ORDERS = "Lab/imaging Orders"
+    PRINCIPLE_ILLNESS_NAVIGATION = "Principle Illness Navigation (Pin)"
+    COLOGUARD = "Cologuard"
+    PAYMENT_RECEIPT = "Payment Receipt"
+    PHYSICAL_THERAPY = "Physical Therapy"
+    CARE_PLAN = "Care Plan"
+    HOME_CARE = "Home Care"
+    ENCOUNTER = "Encounter"
+    BILLS = "Bills"
+    BHI = "Bhi"
+    PCM = "Pcm"
+    COLONOSCOPY_ENDOSCOPY = "Colonoscopy/endoscopy"
+    CCM = "Ccm"
+    MAMMOGRAM = "Mammogram"
+    OUTGOINGS = "Outgoings"
+    TEST = "Test"
+    FORMS = "Forms"
+    MEDICAL_RECORDS_REQUEST = "Medical Records Request"
+    LETTERS = "Letters"
+    PRIOR_AUTHORIZATION = "Prior Authorization"
+    MEDICAL_MARIJUANA = "Medical Marijuana"
+    MEDICAL_RECORDS = "Medical Records"
+    INSURANCE_CARD_ID = "Insurance Card, Id"
+    SLEEP_STUDY = "Sleep Study"
+    PHARMACY = "Pharmacy"
+    CONSULT = "Consult"
+    INSURANCE = "Insurance"
+    PRESCRIPTION = "Prescription"
+    IMMUNIZATION_RECORDS = "Immunization Records"
+    REFERRAL = "Referral"
+    HOSPITAL = "Hospital"
+    RADIOLOGY = "Radiology"
+    LABS = "Labs"
+    PATIENT_DOCUMENTS = "Patient Documents"
 
 
-def try_parse_dob(raw_dob):
-    for fmt in ("%d %b %Y", "%d %B %Y", "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y"):
-        try:
-            dt = datetime.strptime(raw_dob, fmt)
-            return dt.strftime("%m/%d/%Y")
-        except Exception:
-            continue
-    if re.fullmatch(r'(0[1-9]|1[0-2])/([0][1-9]|[12][0-9]|3[01])/\d{4}', raw_dob):
-        return raw_dob
-    return None
+class DoctypeResponse(BaseModel):
+    doc_type: DocType
 
-def extract_information(document):
-    system_prompt = """
+
+class FaxExtraction(BaseModel):
+    """Every field the pipeline needs, produced by one structured-output call."""
+    patient_name: str
+    date_of_birth: str
+    provider_name: str
+    doc_type: DocType
+    sender: str
+    comment: str
+
+
+# System prompts are module constants so every request sends a byte-identical
+# prefix (system first, document last), which lets OpenAI prompt caching hit.
+_EXTRACT_SYSTEM_PROMPT = """
     You are a clinical document extractor. Extract the following from the provided medical fax file:
 
     - patient_name: The patient's full name, as shown in the document.
@@ -64,67 +96,12 @@ def extract_information(document):
     - Do NOT include provider credentials (e.g., "MD", "DO", "APN", "PA-C"). Only return the provider's name.
     - Respond ONLY with a valid JSON object.
     """
-    response = openai(
-        messages=[
-            {'role': 'system', 'content': system_prompt},
-            {'role': 'user', 'content': document}
-        ],
-        response_text=DocumentInformation
-    )
-    # Handle both response types
-    resp_content = response.content if hasattr(response, 'content') else response
-    data = json.loads(resp_content)
-
-    # Optionally validate & parse date here (using your try_parse_dob)
-    date_of_birth = try_parse_dob(data.get("date_of_birth", ""))
-    patient_name = data.get("patient_name", "")
-    provider_name = data.get("provider_name", "")
-
-    return date_of_birth, patient_name, provider_name
 
-def find_doctype(document: str) -> str:
-    doc_type_list = [
-        "Lab/imaging Orders",
-        "Principle Illness Navigation (Pin)",
-        "Cologuard",
-        "Payment Receipt",
-        "Physical Therapy",
-        "Care Plan",
-        "Home Care",
-        "Encounter",
-        "Bills",
-        "Bhi",
-        "Pcm",
-        "Colonoscopy/endoscopy",
-        "Ccm",
-        "Mammogram",
-        "Outgoings",
-        "Test",
-        "Forms",
-        "Medical Records Request",
-        "Letters",
-        "Prior Authorization",
-        "Medical Marijuana",
-        "Medical Records",
-        "Insurance Card, Id",
-        "Sleep Study",
-        "Pharmacy",
-        "Consult",
-        "Insurance",
-        "Prescription",
-        "Immunization Records",
-        "Referral",
-        "Hospital",
-        "Radiology",
-        "Labs",
-        "Patient Documents"
-    ]
-
-    # System prompt for the LLM
-    system_prompt = f"""
-    You are a medical document classifier.
-    From the list below, select the single most appropriate document type for the provided document content.
+_DOC_TYPE_LIST = tuple(t.value for t in DocType)
+_DOC_TYPE_LIST_JOINED = ", ".join(_DOC_TYPE_LIST)
 
+# Shared by the doctype agent and the single-call extractor
+_DOC_TYPE_DEFINITIONS = """\
     --- Document Type Definitions ---
     1. Consult: Includes consultation notes, progress notes, evaluation notes, and encounter notes received from a doctor’s office, clinic, or hospital (Outpatient). These documents reflect the provider’s assessment and care plan during a specific visit.
     2. Hospital: Includes comprehensive documentation from hospital encounters, inpatient and outpatient. This may include Emergency/ED notes, History & Physical (H&P), Discharge Summaries, After Visit Summaries, Summary of Care, and related ED or outpatient orders. These records capture evaluation, treatment, and discharge planning.
@@ -150,56 +127,209 @@ def find_doctype(document: str) -> str:
     22. Patient Documents: Non-clinical papers tied to the patient, such as police reports, licenses, proof of residence, ESA forms, photos, or legal forms affecting care.
     23. Care Plan: Care management summaries (often from insurers), goals/recommendations/risks/contacts for care coordination.
     --- End Definitions ---
+"""
 
+_DOCTYPE_SYSTEM_PROMPT = f"""
+    You are a medical document classifier.
+    From the list below, select the single most appropriate document type for the provided document content.
+
+{_DOC_TYPE_DEFINITIONS}
     Your options are:
-    {', '.join(doc_type_list)}
+    {_DOC_TYPE_LIST_JOINED}
 
     Only return the type EXACTLY as it appears in the list above.
     """
 
+_SENDER_SYSTEM_PROMPT = """
+    You are a document extractor. From the provided document, extract ONLY the sender name (clinic, lab, hospital, organization, or entity that sent or originated the document).
+    Return only the sender name as a string.
+    Do not include any explanations or extra text.
+    """
+
+_COMMENTS_SYSTEM_PROMPT = """
+    You are an assistant that provides concise, clinically relevant comments or summaries for medical documents.
+    Review the provided document and generate either:
+    - 2 to 4 bullet points summarizing key findings, recommendations, or next steps, OR
+    - a short paragraph (2 to 3 lines) summarizing the document's most important details.
+    Be clear, avoid unnecessary details, and keep the comments actionable and relevant to clinical care.
+    Do not copy large sections from the original document.
+    """
+
+_EXTRACT_ALL_SYSTEM_PROMPT = f"""
+    You are a clinical document processor. From the provided medical fax, return a JSON object with:
+
+    - patient_name: The patient's full name, as shown in the document.
+    - date_of_birth: The patient's date of birth, in mm/dd/yyyy format. Convert if necessary.
+    - provider_name: The referring, ordering, or "To:" provider—the person to whom this fax was sent, not the author, interpreter, or signer of the report. If the document contains a "To:" section, extract the name found there. If no "To:" is present, use the provider explicitly listed as the ordering/referring physician or simply Physician:. Do NOT extract any names from the end of the document, signature, or interpreting provider sections. Do NOT include credentials (e.g., "MD", "DO", "APN", "PA-C").
+    - doc_type: The single most appropriate document type, chosen EXACTLY from: {_DOC_TYPE_LIST_JOINED}
+    - sender: ONLY the name of the clinic, lab, hospital, organization, or entity that sent or originated the document.
+    - comment: 2 to 4 bullet points, or a short paragraph (2 to 3 lines), with the clinically relevant findings, recommendations, or next steps. Do not copy large sections from the document.
+
+{_DOC_TYPE_DEFINITIONS}
+    Use an empty string for any text field that is missing.
+    """
+
+
+def openai(messages, response_text, prompt_cache_key=None, temperature=None):
+    kwargs = {}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    if response_text:
+        kwargs["response_format"] = response_text
+    if prompt_cache_key:
+        # Pins requests sharing the same system prompt to the same cache shard
+        kwargs["prompt_cache_key"] = prompt_cache_key
+    completion = client.chat.completions.parse(
+        model=MODEL_NAME,
+        messages=messages,
+        **kwargs,
+    )
+    return completion.choices[0].message
+
+
+def _head(doc: str, n_chars: int) -> str:
+    return doc[:n_chars]
+
+
+@lru_cache(maxsize=1)
+def _response_cache():
+    """Return the shared semantic response cache, or None if unavailable."""
+    try:
+        from .correction_store_rag import ResponseCacheStore
+        return ResponseCacheStore()
+    except Exception as e:
+        print(f"LLM response cache unavailable: {e}")
+        return None
+
+
+def _cached_answer(agent: str, document: str, compute) -> str:
+    """Return a cached answer for a near-duplicate document, else compute and store it."""
+    cache = _response_cache()
+    if cache is None:
+        return compute(document)
+    try:
+        embedding = cache.embed(document)
+        hit = cache.get(agent, embedding)
+        if hit:
+            return hit
+    except Exception as e:
+        print(f"LLM response cache lookup failed ({agent}): {e}")
+        return compute(document)
+    result = compute(document)
+    if result:
+        try:
+            cache.put(agent, document, embedding, result)
+        except Exception as e:
+            print(f"LLM response cache store failed ({agent}): {e}")
+    return result
+
+
+@lru_cache(maxsize=4096)
+def try_parse_dob(raw_dob):
+    if not raw_dob:
+        return None
+    # Common case: already in the target mm/dd/yyyy format
+    if _DOB_US.fullmatch(raw_dob):
+        return raw_dob
+    for fmt in _DOB_FORMATS:
+        try:
+            dt = datetime.strptime(raw_dob, fmt)
+            return dt.strftime("%m/%d/%Y")
+        except Exception:
+            continue
+    return None
+
+def extract_information(document):
+    response = openai(
+        messages=[
+            {'role': 'system', 'content': _EXTRACT_SYSTEM_PROMPT},
+            {'role': 'user', 'content': _head(document, EXTRACT_CHAR_BUDGET)}
+        ],
+        response_text=DocumentInformation,
+        prompt_cache_key="extract-v1",
+    )
+    # Handle both response types
+    resp_content = response.content if hasattr(response, 'content') else response
+    data = orjson.loads(resp_content)
+
+    # Optionally validate & parse date here (using your try_parse_dob)
+    date_of_birth = try_parse_dob(data.get("date_of_birth", ""))
+    patient_name = data.get("patient_name", "")
+    provider_name = data.get("provider_name", "")
+
+    return date_of_birth, patient_name, provider_name
+
+def find_doctype(document: str) -> str:
+    return _cached_answer("doctype", _head(document, DOCTYPE_CHAR_BUDGET), _classify_doctype)
+
+
+def _classify_doctype(document: str) -> str:
     response = openai(
         messages=[
-            {'role': 'system', 'content': system_prompt},
+            {'role': 'system', 'content': _DOCTYPE_SYSTEM_PROMPT},
             {'role': 'user', 'content': document}
         ],
-        response_text=None
+        response_text=DoctypeResponse,
+        prompt_cache_key="doctype-v1",
+        temperature=0,
     )
-    doctype = response.content.strip() if hasattr(response, 'content') else str(response).strip()
-    return doctype
+    # Structured output constrains the answer to a DocType member
+    parsed = getattr(response, 'parsed', None)
+    return parsed.doc_type.value if parsed else ""
 
 
 def find_sub_doctype(document: str) -> str:
-    system_prompt = """
-    You are a document extractor. From the provided document, extract ONLY the sender name (clinic, lab, hospital, organization, or entity that sent or originated the document).
-    Return only the sender name as a string.
-    Do not include any explanations or extra text.
-    """
+    return _cached_answer("sender", _head(document, SENDER_CHAR_BUDGET), _extract_sender)
+
+
+def _extract_sender(document: str) -> str:
     response = openai(
         messages=[
-            {'role': 'system', 'content': system_prompt},
+            {'role': 'system', 'content': _SENDER_SYSTEM_PROMPT},
             {'role': 'user', 'content': document}
         ],
-        response_text=None
+        response_text=None,
+        prompt_cache_key="sender-v1",
+        temperature=0,
     )
     final_response = response.content.strip() if hasattr(response, 'content') else str(response).strip()
     return final_response
 
 def generate_document_comments(document: str) -> str:
-    system_prompt = """
-    You are an assistant that provides concise, clinically relevant comments or summaries for medical documents.
-    Review the provided document and generate either:
-    - 2 to 4 bullet points summarizing key findings, recommendations, or next steps, OR
-    - a short paragraph (2 to 3 lines) summarizing the document's most important details.
-    Be clear, avoid unnecessary details, and keep the comments actionable and relevant to clinical care.
-    Do not copy large sections from the original document.
-    """
     response = openai(
         messages=[
-            {'role': 'system', 'content': system_prompt},
+            {'role': 'system', 'content': _COMMENTS_SYSTEM_PROMPT},
             {'role': 'user', 'content': document}
         ],
-        response_text=None
+        response_text=None,
+        prompt_cache_key="comments-v1",
     )
     final_response = response.content.strip() if hasattr(response, 'content') else str(response).strip()
     return final_response
 
+
+def extract_all(document: str) -> dict:
+    """Extract every field in one call, so the model reads the document once.
+
+    Returns the same keys the per-field agents fill in the pipeline state.
+    """
+    response = openai(
+        messages=[
+            {'role': 'system', 'content': _EXTRACT_ALL_SYSTEM_PROMPT},
+            {'role': 'user', 'content': document}
+        ],
+        response_text=FaxExtraction,
+        prompt_cache_key="extract-all-v1",
+        temperature=0,
+    )
+    parsed = getattr(response, 'parsed', None)
+    if parsed is None:
+        return {}
+    return {
+        "date_of_birth": try_parse_dob(parsed.date_of_birth),
+        "patient_name": parsed.patient_name,
+        "provider_name": parsed.provider_name,
+        "doc_type": parsed.doc_type.value,
+        "doc_subtype": parsed.sender.strip(),
+        "comment": parsed.comment.strip(),
+    }
@@ -1,9 +1,29 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import MappingProxyType
 from typing_extensions import TypedDict
-from typing import Dict, Any
-from langgraph.graph import StateGraph, START, END
+from typing import Dict, Any, Final, Iterator, Mapping, Tuple
+
+from .ollama_agent import (
+    extract_all, extract_information, find_doctype, find_sub_doctype, generate_document_comments,
+)
+from .text_utils import canonicalize
+
+# doc_type -> provider the document is always assigned to
+_DOC_TYPE_PROVIDER_MAP: Final[Mapping[str, str]] = MappingProxyType({
+    "Prior Authorization": "Medical a-Records",
+    "Medical a-Records": "Prior a-Authorizations",
+    "Forms": "Forms A-staff",
+})
+
+# Documents shorter than this (e.g. OCR failures) skip the RAG lookup
+_RAG_MIN_DOC_CHARS = 200
+
+# Provider names that are always reassigned to Asim Ali
+_PROVIDER_OVERRIDE_RE = re.compile(r"azz|fazal", re.IGNORECASE)
 
 class AgentState(TypedDict):
-    input_text: str
     date_of_birth: str
     patient_name: str
     provider_name: str
@@ -11,9 +31,8 @@ class AgentState(TypedDict):
     doc_subtype: str
     comment: str
 
-def call_llm_1(state: AgentState) -> dict:
-    from .ollama_agent import extract_information
-    md = state["input_text"]
+# Each call gets the document text directly; it is never stored in the state.
+def call_llm_1(md: str) -> dict:
     date_of_birth, patient_name, provider_name = extract_information(md)
     return {
         "date_of_birth": date_of_birth,
@@ -21,70 +40,50 @@ def call_llm_1(state: AgentState) -> dict:
         "provider_name": provider_name
     }
 
-def call_llm_2(state: AgentState) -> dict:
-    from .ollama_agent import find_doctype
-    md = state["input_text"]
+def call_llm_2(md: str) -> dict:
     doc_type = find_doctype(md)
     return {"doc_type": doc_type}
 
-def call_llm_3(state: AgentState) -> dict:
-    from .ollama_agent import find_sub_doctype
-    md = state["input_text"]
+def call_llm_3(md: str) -> dict:
     doc_subtype = find_sub_doctype(md)
     return {"doc_subtype": doc_subtype}
 
-def call_llm_4(state: AgentState) ->dict:
-    from .ollama_agent import generate_document_comments
-    md = state["input_text"]
+def call_llm_4(md: str) -> dict:
     comment = generate_document_comments(md)
     return {"comment": comment}
 
 def aggregator(state: dict) -> dict:
-    # Define mapping from doc_type to provider_name
-    mapping = {
-        "Prior Authorization": "Medical a-Records",
-        "Medical a-Records": "Prior a-Authorizations",
-        "Forms": "Forms A-staff"
-    }
     doc_type = state.get("doc_type")
-    if doc_type in mapping:
-        state["provider_name"] = mapping[doc_type]
+    if doc_type in _DOC_TYPE_PROVIDER_MAP:
+        state["provider_name"] = _DOC_TYPE_PROVIDER_MAP[doc_type]
 
     provider_name = state.get("provider_name")
-    tokens = ("azz", "fazal")
-    if provider_name and any(t in provider_name.casefold() for t in tokens):
+    if provider_name and _PROVIDER_OVERRIDE_RE.search(provider_name):
         state["provider_name"] = "Asim Ali"
     return state
 
 
-parallel_builder = StateGraph(AgentState)
-parallel_builder.add_node("call_llm_1", call_llm_1)
-parallel_builder.add_node("call_llm_2", call_llm_2)
-parallel_builder.add_node("call_llm_3", call_llm_3)
-parallel_builder.add_node("call_llm_4", call_llm_4)
-parallel_builder.add_node("aggregator", aggregator)
-
-parallel_builder.add_edge(START, "call_llm_1")
-parallel_builder.add_edge(START, "call_llm_2")
-parallel_builder.add_edge(START, "call_llm_3")
-parallel_builder.add_edge(START, "call_llm_4")
-parallel_builder.add_edge("call_llm_1", "aggregator")
-parallel_builder.add_edge("call_llm_2", "aggregator")
-parallel_builder.add_edge("call_llm_3", "aggregator")
-parallel_builder.add_edge("call_llm_4", "aggregator")
-parallel_builder.add_edge("aggregator", END)
-parallel_workflow = parallel_builder.compile()
-
-def _apply_rag_corrections(state: dict) -> dict:
+# The four LLM calls are network-bound, so threads overlap them (the GIL is
+# released while waiting on the OpenAI HTTP round-trip). Shared across requests.
+_LLM_CALLS = (call_llm_1, call_llm_2, call_llm_3, call_llm_4)
+_LLM_POOL = ThreadPoolExecutor(max_workers=len(_LLM_CALLS), thread_name_prefix="fax-llm")
+
+# "single": one structured call returns every field (the document is read once).
+# "parallel": the four per-field calls above, which stream partial results.
+LLM_MODE = os.getenv("FAX_LLM_MODE", "single").strip().lower()
+
+def _apply_rag_corrections(state: dict, doc_text: str) -> dict:
     """Query RAG for known corrections and apply them if found.
     Only overrides keys that exist in the stored correction (e.g., doc_type/doc_subtype).
     """
     try:
-        from .correction_store_rag import RAGCorrectionStore
-        store = RAGCorrectionStore()
-        doc_text = state.get("input_text", "")
         if not doc_text:
             return state
+        # Nothing worth correcting: junk text or the LLMs found nothing
+        if len(doc_text) < _RAG_MIN_DOC_CHARS or not any(state.get(k) for k in ("doc_type", "patient_name")):
+            return state
+        from .correction_store_rag import get_store
+        store = get_store()
         correction: Dict[str, Any] = store.query(doc_text)
         if correction:
             for k in ("doc_type", "doc_subtype"):
@@ -97,7 +96,6 @@ def _apply_rag_corrections(state: dict) -> dict:
 
 def init_agent_state() -> AgentState:
     return {
-        "input_text": "",
         "date_of_birth": "",
         "patient_name": "",
         "provider_name": "",
@@ -106,10 +104,30 @@ def init_agent_state() -> AgentState:
         "comment": ""
     }
 
-def process_fax(input_text: str) -> AgentState:
+def iter_process_fax(input_text: str) -> Iterator[Tuple[str, dict]]:
+    """Run the pipeline, yielding ("partial", fields) as each LLM call finishes
+    and finally ("final", state) once aggregation and RAG corrections are applied.
+
+    Partial fields are raw model output; only the final state is authoritative.
+    """
     state = init_agent_state()
-    state["input_text"] = input_text
-    state = parallel_workflow.invoke(state)
+    input_text = canonicalize(input_text)
+    if LLM_MODE == "parallel":
+        futures = [_LLM_POOL.submit(fn, input_text) for fn in _LLM_CALLS]
+        for fut in as_completed(futures):
+            fields = fut.result()
+            state.update(fields)
+            yield "partial", fields
+    else:
+        fields = extract_all(input_text)
+        state.update(fields)
+        yield "partial", fields
+    state = aggregator(state)
     # Apply any known user-provided corrections from RAG
-    state = _apply_rag_corrections(state)
-    return state
+    state = _apply_rag_corrections(state, input_text)
+    yield "final", state
+
+def process_fax(input_text: str) -> AgentState:
+    for kind, data in iter_process_fax(input_text):
+        if kind == "final":
+            return data
@@ -6,20 +6,42 @@ Selenium/browser automation is handled on the frontend desktop app.
 Endpoints:
 - GET  /health
 - POST /process                     -> run LLM pipeline on provided Markdown text
+- POST /process_url                 -> convert a document URL to Markdown, then run the pipeline
+- POST /process_url/stream          -> same, streamed as NDJSON events while fields are produced
 - POST /training/save_correction    -> persist correction to RAG store
 
 Run: uvicorn backend.server:app --reload
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import orjson
 from pydantic import BaseModel
 
-from .doc_agent import convert_document
-from .process_fax import process_fax
-from .correction_store_rag import RAGCorrectionStore
+from .doc_agent import convert_document, log_ocr_simd
+from .gzip_route import GzipRoute
+from .process_fax import iter_process_fax, process_fax
+from .correction_store_rag import get_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(log_ocr_simd)
+    # Load the encoder and open Chroma once, before the first request needs them
+    try:
+        app.state.rag_store = await asyncio.to_thread(get_store)
+    except Exception as e:
+        print(f"RAG store unavailable at startup: {e}")
+        app.state.rag_store = None
+    yield
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+# Must be set before the routes below are declared
+app.router.route_class = GzipRoute
 
 
 class ProcessBody(BaseModel):
@@ -48,9 +70,9 @@ def health():
 
 
 @app.post("/process", response_model=ProcessResult)
-def process(body: ProcessBody):
+async def process(body: ProcessBody):
     try:
-        st = process_fax(body.input_text)
+        st = await asyncio.to_thread(process_fax, body.input_text)
 
         return ProcessResult(**{
             "md": body.input_text,
@@ -70,10 +92,10 @@ class ProcessUrlBody(BaseModel):
 
 
 @app.post("/process_url", response_model=ProcessResult)
-def process_url(body: ProcessUrlBody):
+async def process_url(body: ProcessUrlBody):
     try:
-        md = convert_document(body.url)
-        st = process_fax(md)
+        md = await asyncio.to_thread(convert_document, body.url)
+        st = await asyncio.to_thread(process_fax, md)
         return ProcessResult(**{
             "md": md,
             "date_of_birth": st.get("date_of_birth", ""),
@@ -87,12 +109,36 @@ def process_url(body: ProcessUrlBody):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _process_url_events(url: str):
+    """NDJSON lines: {"stage": "ocr_done"}, then {"field", "value"} per LLM field
+    as it arrives, then {"result": ProcessResult} (or {"error": ...})."""
+    try:
+        md = convert_document(url)
+        yield orjson.dumps({"stage": "ocr_done"}) + b"\n"
+        for kind, data in iter_process_fax(md):
+            if kind == "partial":
+                for field, value in data.items():
+                    yield orjson.dumps({"field": field, "value": value}) + b"\n"
+            else:
+                result = ProcessResult(md=md, **{k: data.get(k, "") for k in ProcessResult.model_fields if k != "md"})
+                yield orjson.dumps({"result": result.model_dump()}) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so report failures in-band
+        yield orjson.dumps({"error": str(e)}) + b"\n"
+
+
+@app.post("/process_url/stream")
+def process_url_stream(body: ProcessUrlBody):
+    # Sync generator: Starlette iterates it in the threadpool, off the event loop
+    return StreamingResponse(_process_url_events(body.url), media_type="application/x-ndjson")
+
+
 @app.post("/training/save_correction")
-def training_save_correction(body: SaveCorrectionBody):
+async def training_save_correction(body: SaveCorrectionBody, request: Request):
     try:
-        store = RAGCorrectionStore()
+        store = request.app.state.rag_store or get_store()
         corr = {"doc_type": body.doc_type, "doc_subtype": body.doc_subtype}
-        store.add(body.doc_text, corr)
+        await asyncio.to_thread(store.add, body.doc_text, corr)
         return {"saved": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,24 @@
+import re
+import unicodedata
+
+# Stand-alone page markers left by OCR: "Page 2", "Page 2 of 5", "- 2 -"
+_PAGE_MARKER_RE = re.compile(
+    r"^[ \t]*(?:page[ \t]*\d+(?:[ \t]*(?:of|/)[ \t]*\d+)?|-[ \t]*\d+[ \t]*-)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_HSPACE_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def canonicalize(text: str) -> str:
+    """Normalize fax text so trivially different copies hash, embed and prompt identically.
+
+    Applies NFKC, unifies line endings, drops page-number lines, collapses
+    runs of spaces/tabs and of blank lines, and strips the ends.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _PAGE_MARKER_RE.sub("", text)
+    text = _HSPACE_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
+    return text.strip()
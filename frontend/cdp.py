@@ -0,0 +1,76 @@
+"""
+Minimal Chrome DevTools Protocol client for hot-path DOM reads.
+
+Selenium sends every command over HTTP to chromedriver, which relays it to
+Chrome over CDP. For read-only queries we talk to the page's DevTools
+websocket directly instead, skipping the chromedriver hop.
+"""
+
+import itertools
+import json
+import threading
+import urllib.request
+from typing import Any, Optional
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # optional: callers fall back to Selenium
+    websocket = None
+
+
+class CDPError(RuntimeError):
+    pass
+
+
+class CDPSession:
+    def __init__(self, ws_url: str, timeout: float = 5):
+        # No Origin header, so Chrome accepts us without --remote-allow-origins
+        self._ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def send(self, method: str, params: Optional[dict] = None) -> dict:
+        with self._lock:
+            msg_id = next(self._ids)
+            self._ws.send(json.dumps({"id": msg_id, "method": method, "params": params or {}}))
+            while True:
+                msg = json.loads(self._ws.recv())
+                if msg.get("id") == msg_id:  # skip any event notifications
+                    break
+        if "error" in msg:
+            raise CDPError(msg["error"].get("message", "CDP error"))
+        return msg.get("result", {})
+
+    def evaluate(self, expression: str) -> Any:
+        """Evaluate a JS expression in the page and return its JSON value."""
+        res = self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": True,
+        })
+        if "exceptionDetails" in res:
+            raise CDPError(res["exceptionDetails"].get("text", "evaluation failed"))
+        return res.get("result", {}).get("value")
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+def connect_page(debugger_address: str, target_id: str, timeout: float = 5) -> Optional[CDPSession]:
+    """Open a CDP session to the page target `target_id`, or None if unavailable.
+
+    chromedriver's window handles are DevTools target ids (older builds prefix
+    them with "CDwindow-"), so a Selenium handle can be passed as is.
+    """
+    if websocket is None:
+        return None
+    target_id = target_id.rsplit("-", 1)[-1] if target_id.startswith("CDwindow-") else target_id
+    with urllib.request.urlopen(f"http://{debugger_address}/json/list", timeout=timeout) as resp:
+        targets = json.loads(resp.read())
+    for t in targets:
+        if t.get("type") == "page" and t.get("id") == target_id and t.get("webSocketDebuggerUrl"):
+            return CDPSession(t["webSocketDebuggerUrl"], timeout=timeout)
+    return None
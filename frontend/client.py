@@ -8,32 +8,216 @@ Then run this client:
   python -m frontend.client
 """
 
+import asyncio
+import gzip
+import hashlib
 import os
+import queue
+import stat
 import sys
 import time
 import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from tkinter import ttk, messagebox
 
-import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+import httpx
+import orjson
 from shutil import which
 import subprocess
 import platform
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-try:
-    # When running as a package (python -m frontend.client)
-    from .talkehr_agent import TalkEHRBot  # type: ignore
-except Exception:
+# Selenium and the talkEHR bot are imported lazily (and preloaded on a
+# background thread by App) so the window paints without waiting on them.
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from .talkehr_agent import TalkEHRBot
+
+
+@lru_cache(maxsize=1)
+def _talkehr_bot_class():
+    try:
+        # When running as a package (python -m frontend.client)
+        from .talkehr_agent import TalkEHRBot  # type: ignore
+    except Exception:
+        try:
+            # When frozen by PyInstaller or run as a script
+            from frontend.talkehr_agent import TalkEHRBot  # type: ignore
+        except Exception:
+            # Last resort if neither package name is available
+            from talkehr_agent import TalkEHRBot  # type: ignore
+    return TalkEHRBot
+
+
+def _app_data_dir() -> Path:
+    """Per-user directory for the client's Chrome profile and caches."""
+    system = platform.system().lower()
+    if system == "windows":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home())
+        return Path(base) / "FaxAutomation"
+    elif system == "darwin":
+        return Path.home() / "Library" / "Application Support" / "FaxAutomation"
+    else:
+        return Path.home() / ".fax_automation"
+
+
+@lru_cache(maxsize=1)
+def _match_cache():
+    """Shared on-disk cache of dropdown picks; MATCH_NO_CACHE=1 turns it off."""
+    if os.getenv("MATCH_NO_CACHE") == "1":
+        return None
     try:
-        # When frozen by PyInstaller or run as a script
-        from frontend.talkehr_agent import TalkEHRBot  # type: ignore
+        from .match_cache import open_match_cache  # type: ignore
     except Exception:
-        # Last resort if neither package name is available
-        from talkehr_agent import TalkEHRBot  # type: ignore
+        try:
+            from frontend.match_cache import open_match_cache  # type: ignore
+        except Exception:
+            from match_cache import open_match_cache  # type: ignore
+    data_dir = _app_data_dir()
+    try:
+        data_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        print(f"Match cache unavailable ({data_dir}): {e}")
+        return None
+    return open_match_cache(str(data_dir / "match_cache.sqlite"))
+
+
+def _preload_automation():
+    try:
+        import selenium.webdriver  # noqa: F401
+        _talkehr_bot_class()
+    except Exception as e:
+        print(f"Background import failed (will retry on use): {e}")
+
+
+class _RetryTransport(httpx.BaseTransport):
+    """Retry connection failures and gateway errors with exponential backoff.
+
+    Transient gateway errors (ngrok/uvicorn restarts) are retried after
+    0.3s, 0.6s, 1.2s before the last response or error reaches the caller.
+    522/524 are the origin-timeout codes some proxies return for a cold backend.
+
+    Only GET/HEAD are retried on gateway statuses and protocol errors: a POST
+    behind a 524 is usually still running, and resending /process would start
+    another OCR+LLM job. POSTs are retried only when the connection never opened.
+    """
+
+    RETRY_STATUSES = frozenset({502, 503, 504, 522, 524})
+    RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+    # The request can't have reached the server, so any method is safe to resend
+    UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+    @classmethod
+    def retry_error(cls, request: httpx.Request, exc: Exception) -> bool:
+        if request.method in cls.IDEMPOTENT_METHODS:
+            return isinstance(exc, cls.RETRY_ERRORS)
+        return isinstance(exc, cls.UNSENT_ERRORS)
+
+    @classmethod
+    def retry_status(cls, request: httpx.Request, status_code: int) -> bool:
+        return request.method in cls.IDEMPOTENT_METHODS and status_code in cls.RETRY_STATUSES
+
+    def __init__(self, transport: httpx.BaseTransport, retries: int = 3, backoff: float = 0.3):
+        self._transport = transport
+        self._retries = retries
+        self._backoff = backoff
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self._retries + 1):
+            last = attempt == self._retries
+            try:
+                response = self._transport.handle_request(request)
+            except self.RETRY_ERRORS as e:
+                if last or not self.retry_error(request, e):
+                    raise
+            else:
+                if last or not self.retry_status(request, response.status_code):
+                    return response
+                response.close()
+            time.sleep(self._backoff * 2 ** attempt)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Async twin of _RetryTransport with the same retry policy."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, retries: int = 3, backoff: float = 0.3):
+        self._transport = transport
+        self._retries = retries
+        self._backoff = backoff
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self._retries + 1):
+            last = attempt == self._retries
+            try:
+                response = await self._transport.handle_async_request(request)
+            except _RetryTransport.RETRY_ERRORS as e:
+                if last or not _RetryTransport.retry_error(request, e):
+                    raise
+            else:
+                if last or not _RetryTransport.retry_status(request, response.status_code):
+                    return response
+                await response.aclose()
+            await asyncio.sleep(self._backoff * 2 ** attempt)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Keep idle connections well past the 60s backoff ceiling so the steady-state
+# loop reuses one socket instead of re-resolving and re-handshaking (httpx
+# drops idle connections after 5s by default). Must stay below the server's
+# keep-alive timeout.
+_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=60.0)
+# Every phase is bounded so a stuck backend can't wedge the Normal-mode loop
+_DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=120.0, write=30.0, pool=5.0)
+
+
+def _build_client() -> httpx.Client:
+    """Pooled keep-alive client for backend calls, with HTTP/2 when available."""
+    return httpx.Client(
+        transport=_RetryTransport(httpx.HTTPTransport(http2=_HTTP2, limits=_LIMITS)),
+        timeout=_DEFAULT_TIMEOUT,
+    )
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=_AsyncRetryTransport(httpx.AsyncHTTPTransport(http2=_HTTP2, limits=_LIMITS)),
+        timeout=_DEFAULT_TIMEOUT,
+    )
+
+# Bodies are pre-serialized with orjson and sent as raw bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Bodies above this many bytes are gzipped before upload (OCR Markdown compresses ~5-10x)
+GZIP_MIN_BYTES = 1024
+
+# Fail fast when the server is unreachable; /process_url (OCR of a multi-page
+# fax + LLM) gets a longer, but still bounded, read budget.
+PROCESS_TIMEOUT = httpx.Timeout(connect=5.0, read=180.0, write=30.0, pool=5.0)
+
+
+# Extra flags for the automation Chrome we launch ourselves: skip image loads
+# and background work so talkEHR pages settle faster for Selenium.
+_PERF_CHROME_ARGS = (
+    "--blink-settings=imagesEnabled=false",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+)
 
 
 def _get_settings() -> dict:
@@ -45,7 +229,44 @@ def _get_settings() -> dict:
     }
 
 
+# Chromedriver candidates are fixed for the life of the process; build them once.
+_EXE_NAME = "chromedriver.exe" if os.name == "nt" else "chromedriver"
+_HERE = os.path.dirname(__file__)
+_REPO_ROOT = os.path.abspath(os.path.join(_HERE, ".."))
+_CANDIDATE_PATHS = (
+    # 1) Next to the bundled executable (PyInstaller onefile)
+    *((os.path.join(os.path.dirname(sys.executable), _EXE_NAME),) if getattr(sys, "frozen", False) else ()),
+    # 2) Dist build directory in the repo
+    os.path.join(_REPO_ROOT, "dist", _EXE_NAME),
+    # 3) Current working directory (e.g., when launched from dist/)
+    os.path.join(os.getcwd(), _EXE_NAME),
+    # 4) Project root and frontend dir (additional fallbacks)
+    os.path.join(_REPO_ROOT, _EXE_NAME),
+    os.path.join(_HERE, _EXE_NAME),
+)
+
+
 def _discover_chromedriver() -> str | None:
+    """Return the chromedriver path, probing the filesystem only once per process.
+
+    Set CHROMEDRIVER_NO_CACHE=1 to re-probe on every call (handy in dev when
+    swapping driver binaries).
+    """
+    if os.getenv("CHROMEDRIVER_NO_CACHE") == "1":
+        return _probe_chromedriver()
+    return _cached_chromedriver()
+
+
+def _is_executable_file(path: str) -> bool:
+    # One stat instead of exists() + access()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and (os.name == "nt" or bool(st.st_mode & 0o111))
+
+
+def _probe_chromedriver() -> str | None:
     """Find chromedriver from the build directory or next to the binary.
 
     Priority:
@@ -57,42 +278,59 @@ def _discover_chromedriver() -> str | None:
 
     Note: Intentionally ignores any CHROMEDRIVER_PATH from .env.
     """
-    exe_name = "chromedriver.exe" if os.name == "nt" else "chromedriver"
-
-    candidates: list[str] = []
-
-    # 1) Next to the bundled executable (PyInstaller onefile)
-    if getattr(sys, "frozen", False):
-        exe_dir = os.path.dirname(sys.executable)
-        candidates.append(os.path.join(exe_dir, exe_name))
-
-    # 2) Dist build directory in the repo
-    here = os.path.dirname(__file__)
-    repo_root = os.path.abspath(os.path.join(here, ".."))
-    candidates.append(os.path.join(repo_root, "dist", exe_name))
-
-    # 3) Current working directory (e.g., when launched from dist/)
-    candidates.append(os.path.join(os.getcwd(), exe_name))
-
-    # 4) Project root and frontend dir (additional fallbacks)
-    candidates.append(os.path.join(repo_root, exe_name))
-    candidates.append(os.path.join(here, exe_name))
-
-    for p in candidates:
-        if os.path.exists(p) and os.access(p, os.X_OK):
+    for p in _CANDIDATE_PATHS:
+        if _is_executable_file(p):
             return p
 
     # 5) On PATH as a last resort
-    path_found = which("chromedriver") or which(exe_name)
-    if path_found:
-        return path_found
+    return which("chromedriver") or which(_EXE_NAME)
+
+
+@lru_cache(maxsize=1)
+def _cached_chromedriver() -> str | None:
+    return _probe_chromedriver()
+
+
+@lru_cache(maxsize=1)
+def _chrome_candidates() -> tuple[str, ...]:
+    """Installed Chrome executables, scanned once; cleared by the Rescan menu entry."""
+    system = platform.system().lower()
+    paths: list[str] = []
+    if system == "windows":
+        paths.extend([
+            r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
+            r"C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
+        ])
+        # where on PATH
+        for name in ("chrome.exe", "google-chrome.exe"):
+            p = which(name)
+            if p:
+                paths.append(p)
+    elif system == "darwin":
+        paths.append("/Applications/Google Chrome.app/Contents/MacOS/Google Chrome")
+        p = which("google-chrome")
+        if p:
+            paths.append(p)
+    else:  # linux and others
+        for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+            p = which(name)
+            if p:
+                paths.append(p)
+    # Remove non-existent
+    return tuple(p for p in paths if os.path.exists(p))
 
-    return None
 
+def build_driver(debugger_address: str) -> "webdriver.Chrome":
+    from selenium import webdriver
+    from selenium.common import TimeoutException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
 
-def build_driver(debugger_address: str) -> webdriver.Chrome:
     chrome_options = Options()
     chrome_options.add_experimental_option("debuggerAddress", debugger_address)
+    # Navigation returns at DOMContentLoaded instead of waiting for every subresource
+    chrome_options.page_load_strategy = "eager"
     # Prefer a bundled/sibling chromedriver if found; otherwise let Selenium Manager resolve
     cd_path = _discover_chromedriver()
     if cd_path:
@@ -101,7 +339,13 @@ def build_driver(debugger_address: str) -> webdriver.Chrome:
     else:
         # Selenium 4.6+ can auto-manage drivers; no path needed
         driver = webdriver.Chrome(options=chrome_options)
-    time.sleep(2)
+    # Attached session is usable once the current tab has finished loading
+    try:
+        WebDriverWait(driver, 10, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+    except TimeoutException:
+        pass
     return driver
 
 
@@ -117,9 +361,42 @@ class App(tk.Tk):
         self.debugger_address = cfg["DEBUGGER_ADDRESS"]
         self.sleep_between_ok_runs = cfg["SLEEP_BETWEEN_OK_RUNS"]
 
+        # Overlap selenium/bot imports with widget creation
+        threading.Thread(target=_preload_automation, daemon=True).start()
+
         self._current_md = ""
+        # (doc hash, doc_type, doc_subtype) of the last correction the server accepted
+        self._last_save_key = None
+        # Widget updates from worker threads are queued and applied on the Tk thread
+        self._ui_queue: queue.Queue = queue.Queue()
+        # Log lines are buffered separately and flushed to the Text widget in one insert per tick
+        self._logq: queue.Queue = queue.Queue()
+        # One attached Chrome session shared by Normal and Training modes
+        self._driver = None
+        self._bot = None
+        self._bot_lock = threading.Lock()
+        # Short background tasks (health, training, saves) share a bounded pool;
+        # the Normal-mode loop keeps its own dedicated thread.
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fax-ui-worker")
+        # One-shot backend calls (health, saves) run as coroutines on an asyncio
+        # loop in its own thread; Tk keeps the main thread, Selenium the pool.
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="fax-asyncio", daemon=True).start()
+        # One backend client per app, so each fax iteration reuses the TCP/TLS
+        # connection; with HTTP/2 (ngrok supports it) a save can share it with
+        # an in-flight /process_url.
+        self.http = _build_client()
+        self._ahttp = _build_async_client()
+        # Chrome debugger probes hit localhost and poll themselves, so they get
+        # their own keep-alive client without the backend retry/backoff.
+        self._debugger_ahttp = httpx.AsyncClient(timeout=2)
         self._build_menu()
         self._build_ui()
+        self._drain_ui_queue()
+        self._drain_log()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Open the keep-alive connection before the first fax needs it
+        self._pool.submit(self._warm_backend)
 
     def _build_ui(self):
         top = ttk.Frame(self)
@@ -166,18 +443,114 @@ class App(tk.Tk):
         self.log.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
         self._log("Ready.")
 
+    def _ensure_bot(self) -> "TalkEHRBot":
+        """Attach to Chrome on first use and reuse the same bot afterwards.
+
+        A cached session whose Chrome was closed or restarted is rebuilt.
+        """
+        with self._bot_lock:
+            if self._driver is not None:
+                try:
+                    self._driver.title  # cheap round-trip; raises once the session is gone
+                except Exception:
+                    self._log("Chrome session lost; re-attaching…")
+                    try:
+                        self._driver.quit()
+                    except Exception:
+                        pass
+                    self._driver = self._bot = None
+            if self._bot is None:
+                self._driver = build_driver(self.debugger_address)
+                self._bot = _talkehr_bot_class()(self._driver, self.debugger_address, _match_cache())
+            return self._bot
+
+    def _warm_backend(self):
+        try:
+            self.http.get(f"{self.api_base_url}/health", timeout=5)
+        except Exception:
+            pass  # offline start is fine; Health Check reports problems
+
+    def _reset_bot(self):
+        """Drop the shared driver/bot so the next use re-attaches to the current Chrome."""
+        with self._bot_lock:
+            driver, self._driver, self._bot = self._driver, None, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _on_close(self):
+        if hasattr(self, "_stop_normal"):
+            self._stop_normal.set()
+        if self._driver is not None:
+            try:
+                # Ends the chromedriver session; the debug Chrome itself stays open
+                self._driver.quit()
+            except Exception:
+                pass
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.http.close()
+        try:
+            self._spawn(self._ahttp.aclose()).result(timeout=1)
+            self._spawn(self._debugger_ahttp.aclose()).result(timeout=1)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.destroy()
+
+    def _spawn(self, coro):
+        """Schedule `coro` on the background asyncio loop; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _ui(self, fn):
+        """Run `fn` on the Tk thread; safe to call from any thread."""
+        self._ui_queue.put(fn)
+
+    def _drain_ui_queue(self):
+        while True:
+            try:
+                fn = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn()
+            except Exception as e:
+                print(f"UI update failed: {e}")
+        self.after(50, self._drain_ui_queue)
+
+    def _drain_log(self):
+        lines = []
+        while True:
+            try:
+                lines.append(self._logq.get_nowait())
+            except queue.Empty:
+                break
+        if lines:
+            self.log.insert(tk.END, "\n".join(lines) + "\n")
+            self.log.see(tk.END)
+        self.after(100, self._drain_log)
+
     def _log(self, msg: str):
-        self.log.insert(tk.END, f"{msg}\n")
-        self.log.see(tk.END)
+        self._logq.put(msg)
 
     # ----- Menu -----
     def _build_menu(self):
         menubar = tk.Menu(self)
+        toolsmenu = tk.Menu(menubar, tearoff=0)
+        toolsmenu.add_command(label="Rescan Chrome/ChromeDriver", command=self.rescan_browsers)
+        menubar.add_cascade(label="Tools", menu=toolsmenu)
         helpmenu = tk.Menu(menubar, tearoff=0)
         helpmenu.add_command(label="About", command=self.show_about)
         menubar.add_cascade(label="Help", menu=helpmenu)
         self.config(menu=menubar)
 
+    def rescan_browsers(self):
+        """Forget cached Chrome/chromedriver locations (e.g. after installing Chrome)."""
+        _chrome_candidates.cache_clear()
+        _cached_chromedriver.cache_clear()
+        self._log("Chrome and ChromeDriver locations will be rescanned on next use.")
+
     def show_about(self):
         app_name = "Fax Automation"
         version = "0.1.0"
@@ -196,71 +569,47 @@ class App(tk.Tk):
         except Exception:
             return 9222
 
-    def _chrome_candidates(self) -> list[str]:
-        system = platform.system().lower()
-        paths: list[str] = []
-        if system == "windows":
-            paths.extend([
-                r"C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
-                r"C:\\Program Files (x86)\\Google\\Chrome\\Application\\chrome.exe",
-            ])
-            # where on PATH
-            for name in ("chrome.exe", "google-chrome.exe"):
-                p = which(name)
-                if p:
-                    paths.append(p)
-        elif system == "darwin":
-            paths.append("/Applications/Google Chrome.app/Contents/MacOS/Google Chrome")
-            p = which("google-chrome")
-            if p:
-                paths.append(p)
-        else:  # linux and others
-            for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
-                p = which(name)
-                if p:
-                    paths.append(p)
-        # Remove non-existent
-        return [p for p in paths if os.path.exists(p)]
-
     def _debug_profile_dir(self) -> str:
-        system = platform.system().lower()
-        if system == "windows":
-            base = os.environ.get("LOCALAPPDATA") or str(Path.home())
-            return str(Path(base) / "FaxAutomation" / "chrome-profile")
-        elif system == "darwin":
-            return str(Path.home() / "Library" / "Application Support" / "FaxAutomation" / "chrome-profile")
-        else:
-            return str(Path.home() / ".fax_automation" / "chrome-profile")
+        return str(_app_data_dir() / "chrome-profile")
+
+    async def _debugger_version(self, timeout: float) -> str | None:
+        """Return the Chrome version string if the debugger answers, else None."""
+        try:
+            r = await self._debugger_ahttp.get(f"http://{self.debugger_address}/json/version", timeout=timeout)
+        except httpx.HTTPError:
+            return None
+        if not r.is_success:
+            return None
+        return orjson.loads(r.content).get("Browser", "")
 
     def check_debugger(self):
-        def _task():
+        async def _task():
             try:
-                r = requests.get(f"http://{self.debugger_address}/json/version", timeout=2)
+                r = await self._debugger_ahttp.get(f"http://{self.debugger_address}/json/version", timeout=2)
                 r.raise_for_status()
-                v = r.json().get("Browser", "")
+                v = orjson.loads(r.content).get("Browser", "")
                 self._log(f"Chrome debugger detected ({v}).")
             except Exception as e:
                 self._log(f"Debugger not reachable on {self.debugger_address}: {e}")
-        threading.Thread(target=_task, daemon=True).start()
+        self._spawn(_task())
 
     def start_chrome_debug(self):
+        self._spawn(self._start_chrome_debug())
+
+    async def _start_chrome_debug(self):
         port = self._debug_port()
         profile_dir = self._debug_profile_dir()
         os.makedirs(profile_dir, exist_ok=True)
 
         # If already running, just report
-        try:
-            r = requests.get(f"http://{self.debugger_address}/json/version", timeout=1)
-            if r.ok:
-                self._log("Chrome debugger already running; using existing instance.")
-                return
-        except Exception:
-            pass
+        if await self._debugger_version(timeout=1) is not None:
+            self._log("Chrome debugger already running; using existing instance.")
+            return
 
-        cands = self._chrome_candidates()
+        cands = _chrome_candidates()
         if not cands:
             self._log("Could not find Chrome. Please install Google Chrome.")
-            messagebox.showerror("Chrome not found", "Google Chrome was not found on this system.")
+            self._ui(lambda: messagebox.showerror("Chrome not found", "Google Chrome was not found on this system."))
             return
 
         chrome_path = cands[0]
@@ -270,25 +619,24 @@ class App(tk.Tk):
             f"--user-data-dir={profile_dir}",
             "--no-first-run",
             "--no-default-browser-check",
+            *_PERF_CHROME_ARGS,
         ]
         try:
             subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            self._log(f"Launched Chrome with debugger on port {port}.")
-            # Give it a moment and verify
-            def _verify():
-                for _ in range(10):
-                    try:
-                        r = requests.get(f"http://{self.debugger_address}/json/version", timeout=1.5)
-                        if r.ok:
-                            v = r.json().get("Browser", "")
-                            self._log(f"Debugger ready ({v}). You can now click 'Start Normal Mode'.")
-                            return
-                    except Exception:
-                        time.sleep(0.5)
-                self._log("Chrome started but debugger not reachable yet.")
-            threading.Thread(target=_verify, daemon=True).start()
         except Exception as e:
             self._log(f"Failed to launch Chrome: {e}")
+            return
+        self._log(f"Launched Chrome with debugger on port {port}.")
+        # Any cached session belonged to a previous Chrome; re-attach on next use
+        await asyncio.to_thread(self._reset_bot)
+        # Give it a moment and verify
+        for _ in range(10):
+            v = await self._debugger_version(timeout=1.5)
+            if v is not None:
+                self._log(f"Debugger ready ({v}). You can now click 'Start Normal Mode'.")
+                return
+            await asyncio.sleep(0.5)
+        self._log("Chrome started but debugger not reachable yet.")
 
     # ---- Normal Mode (local Selenium loop) ----
     def start_normal(self):
@@ -298,25 +646,27 @@ class App(tk.Tk):
         self._log("Starting Normal Mode…")
 
         def _task():
-            driver = None
             try:
-                driver = build_driver(self.debugger_address)
-                bot = TalkEHRBot(driver)
+                bot = self._ensure_bot()
+                idle = 0  # consecutive empty-inbox checks
                 while not self._stop_normal.is_set():
-                    ok = self._run_once(bot)
-                    if not ok:
+                    status = self._run_once(bot)
+                    if status == "error":
                         self._log("Normal iteration failed; stopping.")
                         break
-                    self._log("Iteration complete. Waiting…")
-                    time.sleep(self.sleep_between_ok_runs)
+                    if status == "empty":
+                        # Back off while the inbox stays empty: 3s, 6s, 12s … up to 60s
+                        delay = min(60, self.sleep_between_ok_runs * 2 ** idle)
+                        idle += 1
+                        self._log(f"Inbox empty; checking again in {delay}s.")
+                    else:
+                        idle = 0
+                        delay = self.sleep_between_ok_runs
+                        self._log("Iteration complete. Waiting…")
+                    # Event.wait, so Stop interrupts the pause immediately
+                    self._stop_normal.wait(delay)
             except Exception as e:
                 self._log(f"Normal error: {e}")
-            finally:
-                if driver:
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
         self._normal_thread = threading.Thread(target=_task, daemon=True)
         self._normal_thread.start()
 
@@ -326,42 +676,89 @@ class App(tk.Tk):
             self._log("Stop requested.")
 
     def health_check(self):
-        def _task():
+        async def _task():
             try:
-                r = requests.get(f"{self.api_base_url}/health", timeout=10)
+                r = await self._ahttp.get(f"{self.api_base_url}/health", timeout=10)
                 r.raise_for_status()
-                self._log(f"Health: {r.json()}")
+                self._log(f"Health: {orjson.loads(r.content)}")
             except Exception as e:
                 self._log(f"Health check failed: {e}")
-        threading.Thread(target=_task, daemon=True).start()
+        self._spawn(_task())
 
     # ---- Training Mode ----
     def training_next(self):
         self._log("Processing next fax…")
         def _task():
             try:
-                if not hasattr(self, "_driver") or self._driver is None:
-                    self._driver = build_driver(self.debugger_address)
-                    self._bot = TalkEHRBot(self._driver)
-                ok = self._run_once(self._bot, capture=True)
-                if not ok:
-                    self._log("Training next failed or no fax.")
+                status = self._run_once(self._ensure_bot(), capture=True)
+                if status == "error":
+                    self._log("Training next failed.")
                     return
             except Exception as e:
                 self._log(f"Training next error: {e}")
-        threading.Thread(target=_task, daemon=True).start()
+        self._pool.submit(_task)
 
     # ----- Shared run_once used by both modes (frontend) -----
-    def _run_once(self, bot: TalkEHRBot, capture: bool = False) -> bool:
+    def _show_partial(self, field: str, value):
+        # Early, pre-correction guesses; the final result overwrites them
+        if field == "doc_type":
+            self._ui(lambda: self.pred_doctype_var.set(value))
+        elif field == "doc_subtype":
+            self._ui(lambda: self.pred_subtype_var.set(value))
+        if value:
+            self._log(f"  {field}: {value}")
+
+    def _process_link(self, link: str) -> dict:
+        """Have the server process `link`, showing fields as they stream in.
+
+        Falls back to the one-shot /process_url on servers without the stream endpoint.
+        """
+        body = orjson.dumps({"url": link})
+        with self.http.stream(
+            "POST",
+            f"{self.api_base_url}/process_url/stream",
+            content=body,
+            headers=JSON_HEADERS,
+            timeout=PROCESS_TIMEOUT,
+        ) as r:
+            if r.status_code != 404:
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    evt = orjson.loads(line)
+                    if "field" in evt:
+                        self._show_partial(evt["field"], evt["value"])
+                    elif "result" in evt:
+                        return evt["result"]
+                    elif "error" in evt:
+                        raise RuntimeError(evt["error"])
+                    elif evt.get("stage") == "ocr_done":
+                        self._log("Document converted; extracting fields…")
+                raise RuntimeError("stream ended without a result")
+        r = self.http.post(
+            f"{self.api_base_url}/process_url",
+            content=body,
+            headers=JSON_HEADERS,
+            timeout=PROCESS_TIMEOUT,
+        )
+        r.raise_for_status()
+        return orjson.loads(r.content)
+
+    def _run_once(self, bot: "TalkEHRBot", capture: bool = False) -> str:
+        """Process one fax; returns "ok", "empty" (no unread fax) or "error"."""
         link = bot.get_url()
         if not link:
             self._log("No unread fax found.")
-            return False
+            return "empty"
         # Ask backend to convert and process with LLM + RAG
         self._log("Sending URL to server for processing…")
-        r = requests.post(f"{self.api_base_url}/process_url", json={"url": link}, timeout=None)
-        r.raise_for_status()
-        st = r.json()
+        try:
+            st = self._process_link(link)
+        except (httpx.HTTPError, RuntimeError) as e:
+            # Retries are exhausted by the time this is raised
+            self._log(f"Server processing failed: {e}")
+            return "error"
         self._current_md = st.get("md", "")
         doctype = st.get("doc_type", "")
         subtype = st.get("doc_subtype", "")
@@ -370,13 +767,13 @@ class App(tk.Tk):
         provider_name = st.get("provider_name", "")
         comment = st.get("comment", "")
 
-        # Update UI predicted/correct fields
-        self.after(0, lambda: (
-            self.pred_doctype_var.set(doctype),
-            self.pred_subtype_var.set(subtype),
-            self.correct_doctype_var.set(doctype),
-            self.correct_subtype_var.set(subtype),
-        ))
+        # Update UI predicted/correct fields in one Tk-thread callback
+        def _show_prediction():
+            self.pred_doctype_var.set(doctype)
+            self.pred_subtype_var.set(subtype)
+            self.correct_doctype_var.set(doctype)
+            self.correct_subtype_var.set(subtype)
+        self._ui(_show_prediction)
 
         if not all([patient_name, doctype, provider_name]):
             self._log("Required fields missing; skipping this fax.")
@@ -384,7 +781,7 @@ class App(tk.Tk):
                 bot.cancel_button()
             except Exception:
                 pass
-            return True
+            return "ok"
 
         comment_with_subtype = f"**{subtype}**\n\n{comment}" if subtype else comment
 
@@ -392,34 +789,30 @@ class App(tk.Tk):
             self._log("Patient selection failed; cancel and continue.")
             try:
                 bot.cancel_button()
-                return True
+                return "ok"
             except Exception:
-                return False
+                return "error"
 
-        time.sleep(1)
         if not bot.select_doc_type(doctype):
             self._log(f"Doc type '{doctype}' not found.")
-            return False
+            return "error"
 
-        time.sleep(1)
         if subtype and not bot.select_doc_sub_type(subtype):
             self._log(f"Doc subtype '{subtype}' not found.")
-            return False
+            return "error"
 
-        time.sleep(1)
         if not bot.select_assigned_to(provider_name):
             self._log(f"Provider '{provider_name}' not found.")
-            return False
+            return "error"
 
-        time.sleep(1)
         if not bot.add_comments(comment_with_subtype):
             self._log("Failed to add comments.")
-            return False
+            return "error"
 
         bot.save_button()
-        time.sleep(3)
+        bot.wait_after_save(timeout=5)
         self._log("Selections completed successfully.")
-        return True
+        return "ok"
 
     def save_correction(self):
         if not self._current_md:
@@ -430,14 +823,30 @@ class App(tk.Tk):
             "doc_type": self.correct_doctype_var.get().strip(),
             "doc_subtype": self.correct_subtype_var.get().strip(),
         }
-        def _task():
+        async def _task():
+            doc_hash = hashlib.blake2b(body["doc_text"].encode("utf-8"), digest_size=16).hexdigest()
+            save_key = (doc_hash, body["doc_type"], body["doc_subtype"])
+            if save_key == self._last_save_key:
+                self._log("Correction unchanged since last save; skipped.")
+                return
             try:
-                r = requests.post(f"{self.api_base_url}/training/save_correction", json=body, timeout=20)
+                payload = orjson.dumps(body)
+                headers = JSON_HEADERS
+                if len(payload) > GZIP_MIN_BYTES:
+                    payload = gzip.compress(payload, compresslevel=3)
+                    headers = {**JSON_HEADERS, "Content-Encoding": "gzip"}
+                r = await self._ahttp.post(
+                    f"{self.api_base_url}/training/save_correction",
+                    content=payload,
+                    headers=headers,
+                    timeout=20,
+                )
                 r.raise_for_status()
+                self._last_save_key = save_key
                 self._log("Saved correction to server RAG store.")
             except Exception as e:
                 self._log(f"Save correction failed: {e}")
-        threading.Thread(target=_task, daemon=True).start()
+        self._spawn(_task())
 
 
 def main():
@@ -1,14 +1,24 @@
 import re
+import sys
 import time
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 
-from fuzzywuzzy import fuzz
-from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
-from selenium.webdriver.common.by import By
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Indel
+from rapidfuzz.utils import default_process
+from selenium.common.exceptions import WebDriverException
 
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
 def normalize_name(text: str) -> str:
-    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", (text or "")).lower()).strip()
+    # Interned so the score caches below compare keys by identity on a hit
+    return sys.intern(_WS_RE.sub(" ", _PUNCT_RE.sub(" ", (text or "")).lower()).strip())
 
+@lru_cache(maxsize=4096)
 def first_name_only(raw: str) -> str:
     if not raw:
         return ""
@@ -17,84 +27,270 @@ def first_name_only(raw: str) -> str:
         return after.split()[0].lower() if after else ""
     return normalize_name(raw).split()[0] if raw else ""
 
-def last_name_tokens(raw: str):
+@lru_cache(maxsize=4096)
+def last_name_tokens(raw: str) -> Tuple[str, ...]:
     if not raw:
-        return []
+        return ()
     if "," in raw:
         last = raw.split(",", 1)[0]
-        return [t for t in normalize_name(last).split() if t]
+        return tuple(t for t in normalize_name(last).split() if t)
     toks = normalize_name(raw).split()
-    return toks[1:] if len(toks) > 1 else []
+    return tuple(toks[1:])
 
-def token_similarity(a: str, b: str) -> float:
-    return fuzz.token_set_ratio(a, b) / 100.0
+# Indel similarity and token_set_ratio are symmetric, so (a, b) and (b, a) share one slot
+@lru_cache(maxsize=4096)
+def _indel_sorted(a: str, b: str) -> float:
+    # The metric under fuzz.ratio, without its wrapper; already in [0, 1]
+    return Indel.normalized_similarity(a, b)
 
-def strong_enough_match(target_full: str, candidate_full: str,
-                        base_threshold: float = 0.70,
-                        relaxed_threshold: float = 0.60,
-                        last_partial_thresh: int = 80) -> tuple[bool, float, str]:
-    t_norm = normalize_name(target_full)
-    c_norm = normalize_name(candidate_full)
+@lru_cache(maxsize=4096)
+def _token_set_ratio_sorted(a: str, b: str) -> float:
+    return fuzz.token_set_ratio(a, b)
 
-    score_token = fuzz.token_set_ratio(t_norm, c_norm) / 100.0
-    score_partial = fuzz.partial_ratio(t_norm, c_norm) / 100.0
+def cached_indel_similarity(a: str, b: str) -> float:
+    """fuzz.ratio / 100, memoized on the unordered pair; repeat calls skip the DP."""
+    return _indel_sorted(a, b) if a <= b else _indel_sorted(b, a)
 
-    first_ok = first_name_only(target_full) == first_name_only(candidate_full)
-    last_tokens = last_name_tokens(target_full)
-    last_ok = any(fuzz.partial_ratio(ln, c_norm) >= last_partial_thresh for ln in last_tokens)
+def cached_token_set_ratio(a: str, b: str) -> float:
+    """fuzz.token_set_ratio memoized on the unordered pair. Pass normalized text."""
+    return _token_set_ratio_sorted(a, b) if a <= b else _token_set_ratio_sorted(b, a)
+
+def token_similarity(a: str, b: str) -> float:
+    # fuzzywuzzy lower-cased and stripped punctuation by default; rapidfuzz needs it asked for
+    return fuzz.token_set_ratio(a, b, processor=default_process) / 100.0
+
+def exact_or_substring(target_norm: str, norms: List[str]) -> Optional[int]:
+    """Index of the option equal to `target_norm`, else of the option containing
+    every target word as a whole token (fewest extra words first, then dropdown
+    order). None means fuzzy scoring, with its threshold, has to decide."""
+    if not target_norm:
+        return None
+    if target_norm in norms:
+        return norms.index(target_norm)
+    # Whole tokens only: "ann lee" must not hit "joann leeds", nor a short
+    # option like "ali" every target that happens to contain those letters
+    target_tokens = set(target_norm.split())
+    best = None
+    for i, n in enumerate(norms):
+        tokens = set(n.split())
+        if target_tokens <= tokens and (best is None or len(tokens) < best[0]):
+            best = (len(tokens), i)
+    return best[1] if best is not None else None
 
+def _apply_rules(score_token: float, first_ok: bool, last_ok, partial,
+                 base_threshold: float, relaxed_threshold: float) -> tuple[bool, float, str]:
+    """Match rules, cheapest first. `last_ok` and `partial` are zero-arg callables
+    evaluated only when the token_set rules haven't already decided."""
     if score_token >= base_threshold:
         return True, score_token, "token_set >= base_threshold"
     if first_ok and score_token >= relaxed_threshold:
         return True, score_token, "first name exact + relaxed token_set"
-    if first_ok and last_ok:
-        return True, max(score_token, score_partial), "first exact + last partial"
+    if first_ok and last_ok():
+        return True, max(score_token, partial()), "first exact + last partial"
+    score_partial = partial()
     if score_partial >= base_threshold:
         return True, score_partial, "partial >= base_threshold"
     return False, score_token, "no rule matched"
 
+def strong_enough_match(target_full: str, candidate_full: str,
+                        base_threshold: float = 0.70,
+                        relaxed_threshold: float = 0.60,
+                        last_partial_thresh: int = 80) -> tuple[bool, float, str]:
+    t_norm = normalize_name(target_full)
+    c_norm = normalize_name(candidate_full)
+
+    first_ok = first_name_only(target_full) == first_name_only(candidate_full)
+    score_token = cached_token_set_ratio(t_norm, c_norm) / 100.0
+
+    def last_ok() -> bool:
+        last_tokens = last_name_tokens(target_full)
+        # A substring is a 100 partial_ratio; check it before the O(n*m) fuzz scan
+        return any(ln in c_norm for ln in last_tokens) or process.extractOne(
+            c_norm, last_tokens, scorer=fuzz.partial_ratio, score_cutoff=last_partial_thresh
+        ) is not None
+
+    # A partial score only matters above score_token (the rules take the max or
+    # compare against base_threshold > score_token), so let rapidfuzz stop below it
+    return _apply_rules(score_token, first_ok, last_ok,
+                        lambda: fuzz.partial_ratio(t_norm, c_norm, score_cutoff=score_token * 100) / 100.0,
+                        base_threshold, relaxed_threshold)
+
+def _scores_by_index(query: str, choices: List[str], scorer, score_cutoff: Optional[float] = None) -> List[float]:
+    """Score of each choice by position; choices below `score_cutoff` read as 0."""
+    scores = [0.0] * len(choices)
+    for _, score, idx in process.extract(query, choices, scorer=scorer, limit=None,
+                                         score_cutoff=score_cutoff):
+        scores[idx] = score
+    return scores
+
+def _last_name_hits(target_full: str, c_norms: List[str], indices: List[int],
+                    last_partial_thresh: int) -> set:
+    """Indices (from `indices`) whose candidate contains one of the target's last-name tokens."""
+    hits = set()
+    for ln in last_name_tokens(target_full):
+        # Substring hits need no fuzz; only score the candidates still undecided
+        rest = []
+        for i in indices:
+            if i in hits:
+                continue
+            if ln in c_norms[i]:
+                hits.add(i)
+            else:
+                rest.append(i)
+        if not rest:
+            break
+        for _, _, k in process.extract(ln, [c_norms[i] for i in rest], scorer=fuzz.partial_ratio,
+                                       score_cutoff=last_partial_thresh, limit=None):
+            hits.add(rest[k])
+    return hits
+
+def best_match(target_full: str, candidates: List[str],
+               tiebreak: Optional[Sequence] = None,
+               base_threshold: float = 0.70,
+               relaxed_threshold: float = 0.60,
+               last_partial_thresh: int = 80) -> Optional[Tuple[int, float, str]]:
+    """Pick the best candidate under the strong_enough_match rules, scoring all at once.
+
+    Returns (index, score, reason) or None if nothing passes. On equal scores the
+    candidate with the lower `tiebreak` key wins (e.g. the older MRN).
+    """
+    if not candidates:
+        return None
+    t_norm = normalize_name(target_full)
+    c_norms = [normalize_name(c) for c in candidates]
+    # Verbatim (normalized) name matches need no fuzzy scoring at all
+    exact = [i for i, c in enumerate(c_norms) if c == t_norm]
+    if exact:
+        i = min(exact, key=tiebreak.__getitem__) if tiebreak is not None else exact[0]
+        return i, 1.0, "exact match"
+    t_first = first_name_only(target_full)
+    first_ok = [t_first == first_name_only(c) for c in candidates]
+    token_scores = [sc / 100.0 for sc in _scores_by_index(t_norm, c_norms, fuzz.token_set_ratio)]
+
+    # Partial/last-name scoring only for candidates the token_set rules didn't settle
+    undecided = [
+        i for i, sc in enumerate(token_scores)
+        if sc < base_threshold and not (first_ok[i] and sc >= relaxed_threshold)
+    ]
+    partial_scores = {}
+    last_hits = set()
+    if undecided:
+        # Same bound as strong_enough_match: partials below a candidate's token
+        # score never change its outcome, so prune below the lowest of them
+        sub = _scores_by_index(t_norm, [c_norms[i] for i in undecided], fuzz.partial_ratio,
+                               score_cutoff=min(token_scores[i] for i in undecided) * 100)
+        partial_scores = {i: sc / 100.0 for i, sc in zip(undecided, sub)}
+        last_hits = _last_name_hits(target_full, c_norms, [i for i in undecided if first_ok[i]],
+                                    last_partial_thresh)
+
+    passed = []
+    for i in range(len(candidates)):
+        ok, score, why = _apply_rules(
+            token_scores[i], first_ok[i],
+            lambda i=i: i in last_hits, lambda i=i: partial_scores.get(i, 0.0),
+            base_threshold, relaxed_threshold,
+        )
+        if ok:
+            passed.append((i, score, why))
+    if not passed:
+        return None
+    # Single C-level argmax: highest score, then lowest tiebreak, then first seen
+    if tiebreak is None:
+        return max(passed, key=lambda r: r[1])
+    return min(passed, key=lambda r: (-r[1], tiebreak[r[0]], r[0]))
+
+# jQuery-style visibility: the element has a layout box
+_VISIBLE_OPTIONS_JS = """
+const skip = new Set(['loading...', 'no data', 'no results', 'loading']);
+const out = [];
+for (const o of document.querySelectorAll('.mat-autocomplete-panel mat-option')) {
+  if (!(o.offsetWidth || o.offsetHeight || o.getClientRects().length)) continue;
+  const txt = o.innerText.trim();
+  if (!txt || skip.has(txt.toLowerCase())) continue;
+  out.push([o, txt]);
+}
+return out;
+"""
+
+_CLICK_OPTION_JS = """
+const target = arguments[0];
+for (const o of document.querySelectorAll('.mat-autocomplete-panel mat-option')) {
+  if (!(o.offsetWidth || o.offsetHeight || o.getClientRects().length)) continue;
+  if (o.innerText.trim() === target) {
+    o.scrollIntoView({block: 'center'});
+    o.click();
+    return true;
+  }
+}
+return false;
+"""
+
+_NO_SPINNER_JS = """
+for (const el of document.querySelectorAll('.mat-autocomplete-panel .loading, mat-progress-spinner, mat-spinner')) {
+  if (el.offsetWidth || el.offsetHeight || el.getClientRects().length) return false;
+}
+return true;
+"""
+
+def _wait_ui_idle(driver, timeout: float = 5, poll: float = 0.1) -> bool:
+    """Wait until no loading indicator or Material spinner is visible."""
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            if driver.execute_script(_NO_SPINNER_JS):
+                return True
+        except WebDriverException:
+            pass
+        if time.monotonic() >= end:
+            return False
+        time.sleep(poll)
+
 def _visible_non_loading_options(driver) -> List[Tuple[object, str]]:
-    out = []
+    # One script call instead of find_elements + is_displayed/text per option
     try:
-        options = driver.find_elements(By.CSS_SELECTOR, ".mat-autocomplete-panel mat-option")
-        for o in options:
-            try:
-                if not o.is_displayed():
-                    continue
-                txt = o.text.strip()
-                if not txt:
-                    continue
-                if txt.lower() in ("loading...", "no data", "no results", "loading"):
-                    continue
-                out.append((o, txt))
-            except StaleElementReferenceException:
-                continue
+        return [(o, sys.intern(txt)) for o, txt in driver.execute_script(_VISIBLE_OPTIONS_JS)]
     except Exception:
-        pass
-    return out
+        return []
 
 def _click_option_by_text(driver, target_text: str, retries: int = 3, sleep: float = 0.2) -> bool:
-    css = ".mat-autocomplete-panel mat-option"
     last_exc = None
     for _ in range(retries):
         try:
-            options = driver.find_elements(By.CSS_SELECTOR, css)
-            for o in options:
-                try:
-                    if o.is_displayed() and o.text.strip() == target_text:
-                        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", o)
-                        try:
-                            o.click()
-                        except WebDriverException:
-                            driver.execute_script("arguments[0].click();", o)
-                        return True
-                except StaleElementReferenceException as e:
-                    last_exc = e
-                    continue
-        except Exception as e:
+            # Find and click in-browser in a single round-trip
+            if driver.execute_script(_CLICK_OPTION_JS, target_text):
+                return True
+        except WebDriverException as e:
             last_exc = e
         time.sleep(sleep)
     if last_exc:
         print(f"[doc_type] Click by text failed: {last_exc}")
     return False
 
+# Clicks row `idx` (by its data-fax-idx tag, else by position), or the first
+# row containing the expected text if the list shrank; resolving and clicking
+# in-browser leaves no element to go stale
+_CLICK_PATIENT_ROW_JS = """
+const want = arguments[1].toLowerCase();
+// Rows are tagged with data-fax-idx when read; the tag survives until Angular re-renders
+let el = document.querySelector('.patient-drop-down [data-fax-idx="' + arguments[0] + '"]');
+if (!el) {
+  const rows = document.querySelectorAll('.go-search-dropdown.patient-drop-down mat-list-item.mat-list-item');
+  el = rows[arguments[0]] || Array.from(rows).find((r) => r.innerText.toLowerCase().includes(want));
+}
+if (!el) return false;
+el.scrollIntoView({block: 'center'});
+el.click();
+return true;
+"""
+
+def click_patient_row_with_retries(driver, idx, expected_text, retries=3, sleep=0.2):
+    last_exc = None
+    for _ in range(retries):
+        try:
+            if driver.execute_script(_CLICK_PATIENT_ROW_JS, idx, expected_text):
+                return True
+        except WebDriverException as e:
+            last_exc = e
+        time.sleep(sleep)
+    print(f"Failed to click patient after {retries} retries. Last error: {last_exc}")
+    return False
@@ -0,0 +1,69 @@
+"""
+Persistent cache of dropdown picks: (field, normalized query) -> option text.
+
+The same doc types, sender subtypes and assignees come up fax after fax. Once a
+confident fuzzy match has picked an option, later runs fall back to it when it
+is still offered and nothing in the dropdown scores as well.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class MatchCache:
+    def __init__(self, path: str, max_entries: int = 2000):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        # The bot runs on worker threads; all access goes through the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # "picks" replaced an older "matches" table that also held weak fuzzy
+        # picks; those are dropped rather than replayed
+        self._conn.execute("DROP TABLE IF EXISTS matches")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS picks ("
+            " field TEXT, query TEXT, answer TEXT, used REAL,"
+            " PRIMARY KEY (field, query))"
+        )
+        self._conn.commit()
+
+    def get(self, field: str, query: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM picks WHERE field = ? AND query = ?", (field, query)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE picks SET used = ? WHERE field = ? AND query = ?", (time.time(), field, query)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, field: str, query: str, answer: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO picks (field, query, answer, used) VALUES (?, ?, ?, ?)",
+                (field, query, answer, time.time()),
+            )
+            # Least recently used entries go first once the cache is full
+            self._conn.execute(
+                "DELETE FROM picks WHERE rowid NOT IN"
+                " (SELECT rowid FROM picks ORDER BY used DESC LIMIT ?)",
+                (self._max_entries,),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_match_cache(path: str) -> Optional[MatchCache]:
+    """Open the cache at `path`, or None if the file can't be used."""
+    try:
+        return MatchCache(path)
+    except sqlite3.Error as e:
+        print(f"Match cache unavailable ({path}): {e}")
+        return None
@@ -39,6 +39,7 @@ pyinstaller \
   --hidden-import pyparsing \
   --hidden-import setuptools \
   --hidden-import markupsafe \
+  --hidden-import h2 \
   --name "$APP_NAME" \
   "$ENTRY"
 
@@ -1,123 +1,344 @@
 import re
+import sys
 import time
-from typing import Optional
+from functools import lru_cache, wraps
+from typing import Optional, Tuple
 
 from rapidfuzz import fuzz, process
-from selenium.common import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.common import NoSuchWindowException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 try:
-    from .helper import _click_option_by_text, _visible_non_loading_options, strong_enough_match  # type: ignore
+    from .cdp import connect_page  # type: ignore
 except Exception:
-    from helper import _click_option_by_text, _visible_non_loading_options, strong_enough_match  # type: ignore
+    from cdp import connect_page  # type: ignore
 
-
-def click_patient_row_with_retries(driver, idx, expected_text, retries=3, sleep=0.2):
-    css = ".go-search-dropdown.patient-drop-down mat-list-item.mat-list-item"
-    last_exc = None
-    for attempt in range(1, retries + 1):
-        try:
-            rows = driver.find_elements(By.CSS_SELECTOR, css)
-            if not rows:
-                time.sleep(sleep)
-                continue
-            if idx < len(rows):
-                elem = rows[idx]
-            else:
-                elem = next((r for r in rows if expected_text.lower() in r.text.lower()), None)
-                if not elem:
+try:
+    from .helper import (  # type: ignore
+        _click_option_by_text, _visible_non_loading_options, _wait_ui_idle, best_match,
+        cached_indel_similarity, cached_token_set_ratio, click_patient_row_with_retries,
+        exact_or_substring, strong_enough_match,
+    )
+except Exception:
+    from helper import (  # type: ignore
+        _click_option_by_text, _visible_non_loading_options, _wait_ui_idle, best_match,
+        cached_indel_similarity, cached_token_set_ratio, click_patient_row_with_retries,
+        exact_or_substring, strong_enough_match,
+    )
+
+
+def _retry_on_stale(retries: int = 3, sleep: float = 0.1):
+    """Re-run the call if the DOM re-rendered under it. The wrapped function must
+    look its elements up afresh on each call, or the retry just fails again."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(retries):
+                try:
+                    return fn(*args, **kwargs)
+                except StaleElementReferenceException:
+                    if attempt == retries - 1:
+                        raise
                     time.sleep(sleep)
-                    continue
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", elem)
-            try:
-                elem.click()
-            except WebDriverException:
-                driver.execute_script("arguments[0].click();", elem)
-            return True
-        except StaleElementReferenceException as e:
-            last_exc = e
-            time.sleep(sleep)
-            continue
-        except Exception as e:
-            last_exc = e
-            time.sleep(sleep)
-            continue
+        return wrapper
+    return deco
+
+
+# What has to be on screen before the step after `step` can start
+_READY_AFTER = {
+    "patient": [
+        (EC.invisibility_of_element_located, (By.CSS_SELECTOR, ".go-search-dropdown.patient-drop-down")),
+        (EC.element_to_be_clickable, (By.ID, "txtdocType")),
+    ],
+    "doc_type": [
+        (EC.invisibility_of_element_located, (By.CSS_SELECTOR, ".cdk-overlay-pane mat-option")),
+        (EC.element_to_be_clickable, (By.ID, "txtdocSubType")),
+    ],
+    "sub_type": [
+        (EC.invisibility_of_element_located, (By.CSS_SELECTOR, ".cdk-overlay-pane mat-option")),
+        (EC.presence_of_element_located, (By.XPATH, "//mat-label[contains(text(),'Assigned To')]/ancestor::label")),
+    ],
+    "assigned_to": [
+        (EC.invisibility_of_element_located, (By.CSS_SELECTOR, ".cdk-overlay-pane mat-option")),
+        (EC.element_to_be_clickable, (By.ID, "txtComments")),
+    ],
+}
+
+
+# True once the page has loaded and Angular (talkEHR is an Angular Material
+# app) reports no pending HTTP requests, timers or change detection.
+_PAGE_IDLE_JS = """
+if (document.readyState !== 'complete') return false;
+if (typeof window.getAllAngularTestabilities !== 'function') return true;
+return window.getAllAngularTestabilities().every(function (t) { return t.isStable(); });
+"""
+
+_TAB_INFO_JS = "return [document.title, location.href];"
+
+
+def _is_talker(title: str, url: str) -> bool:
+    return "talkehr" in title.lower() or "talkehr" in url.lower()
+
+
+# Longest wait_idle trusts Angular testability before the spinner check takes
+# over, and how many misses in a row before testability is no longer asked
+_TESTABILITY_TIMEOUT = 1.5
+_TESTABILITY_MAX_FALLBACKS = 3
+
+# Fuzzy score a dropdown pick needs to be remembered in the MatchCache, and
+# above which a fresh score is trusted over whatever was remembered
+_CACHE_MIN_SCORE = 90
+
+
+_INBOX_STATE_JS = """(() => {
+  const iframe = document.getElementById('docIframeView');
+  return {
+    src: iframe ? iframe.src : '',
+    unread: document.querySelectorAll('table.mat-table tr.mat-row.cdk-row.tr-unread.ng-star-inserted').length,
+  };
+})()"""
+
+# Sets the input's value and fires the events Angular listens to, in one call
+_FILL_INPUT_JS = """
+const el = arguments[0];
+el.focus();
+el.value = arguments[1];
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+_PATIENT_ROWS_JS = """
+return Array.from(
+  document.querySelectorAll('.go-search-dropdown.patient-drop-down mat-list-item.mat-list-item'),
+  (r, i) => {
+    r.setAttribute('data-fax-idx', i);
+    const t = r.innerText;
+    const m = t.match(/MRN:(\\d+)/);
+    return {name: t.split('\\n')[0].trim(), mrn: m ? parseInt(m[1], 10) : 0};
+  }
+);
+"""
+
+# [element, text] for each visible element matching arguments[0] that isn't a
+# loading placeholder, or null until at least arguments[1] of them are on screen
+_READY_OPTIONS_JS = """
+const out = [];
+for (const e of document.querySelectorAll(arguments[0])) {
+  if (!(e.offsetWidth || e.offsetHeight || e.getClientRects().length)) continue;
+  if (String(e.className).toLowerCase().includes('loading')) continue;
+  out.push([e, e.innerText.trim()]);
+}
+return out.length >= arguments[1] ? out : null;
+"""
+
+
+def _ready_after(step):
+    """On success, block until the next field is usable instead of sleeping a fixed time."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            ok = fn(self, *args, **kwargs)
+            if ok:
+                self.wait_for_ready(step)
+            return ok
+        return wrapper
+    return deco
 
-    print(f"Failed to click patient after {retries} retries. Last error: {last_exc}")
-    return False
 
+_PUNCT_RE = re.compile(r"[^\w\s]")
 
+
+@lru_cache(maxsize=2048)
+def _normalize_name(name: str) -> str:
+    """Lower-case, drop punctuation and sort the words, so word order doesn't matter.
+
+    Interned: the same option and provider names recur on every fax, and the
+    memoized scorers then match their keys by identity.
+    """
+    return sys.intern(" ".join(sorted(_PUNCT_RE.sub("", name).lower().split())))
+
+
+@lru_cache(maxsize=2048)
+def _split_name(name: str) -> Tuple[str, str]:
+    """(first, last) words of a name, lower-cased; last is '' for one-word names."""
+    parts = name.lower().split()
+    return (parts[0], parts[-1]) if len(parts) >= 2 else (parts[0], '')
+
+
+@lru_cache(maxsize=2048)
 def first_name_only(raw: str) -> str:
     if "," in raw:
         parts = raw.split(",", 1)[1].strip().split()
         return parts[0].lower() if parts else ""
-    tokens = re.sub(r"[^\w\s]", " ", raw).strip().split()
+    tokens = _PUNCT_RE.sub(" ", raw).strip().split()
     return tokens[0].lower() if tokens else ""
 
 
 def token_similarity(a: str, b: str) -> float:
-    return fuzz.token_set_ratio(a, b) / 100.0
+    return cached_token_set_ratio(a, b) / 100.0
 
 
 class TalkEHRBot:
-    def __init__(self, driver):
+    def __init__(self, driver, debugger_address: Optional[str] = None, match_cache=None):
         self.driver = driver
+        self.debugger_address = debugger_address
+        self._cdp = None
+        self._cdp_target = None  # handle self._cdp was opened for (None: not tried)
+        self._talker_handle = None  # window handle of the talkEHR tab found last
+        self._match_cache = match_cache  # optional MatchCache shared across runs
+        self._idle_fallbacks = 0  # consecutive wait_idle calls where testability never settled
+
+    def evaluate(self, expression: str):
+        """Evaluate a JS expression in the talkEHR tab.
+
+        Goes straight to Chrome over CDP when the debugger address is known,
+        skipping chromedriver; otherwise (or on any CDP failure) uses Selenium.
+        The session is opened once per tab and reused across polls.
+        """
+        handle = self._talker_handle
+        if self.debugger_address and handle is not None:
+            try:
+                if self._cdp_target != handle:
+                    self._drop_cdp()
+                    # Remembered even when no session opens, so a tab CDP
+                    # can't reach isn't looked up again on every poll
+                    self._cdp_target = handle
+                    self._cdp = connect_page(self.debugger_address, handle)
+                if self._cdp is not None:
+                    return self._cdp.evaluate(expression)
+            except Exception as e:
+                print(f"CDP evaluate failed, using WebDriver: {e}")
+                self._drop_cdp()
+        return self.driver.execute_script(f"return ({expression});")
+
+    def _drop_cdp(self):
+        """Forget the CDP session, e.g. after the WebDriver moved to another tab."""
+        if self._cdp is not None:
+            self._cdp.close()
+        self._cdp = None
+        self._cdp_target = None
+
+    def _cached_pick(self, field: str, query: str, texts) -> Optional[str]:
+        """Option picked for `query` on an earlier fuzzy match, if it's offered now."""
+        if self._match_cache is None:
+            return None
+        answer = self._match_cache.get(field, query)
+        return answer if answer in texts else None
+
+    def _remember_pick(self, field: str, query: str, text: str, score: float):
+        # Only confident picks are stored; a weak one would be replayed forever
+        if self._match_cache is not None and score >= _CACHE_MIN_SCORE:
+            self._match_cache.put(field, query, text)
+
+    def _fuzzy_or_cached(self, field: str, query: str, texts, norms, scorer,
+                         threshold: float = 0) -> Optional[Tuple[int, float, bool]]:
+        """(index, score, cached) of the option to pick once exact matching failed.
+
+        A fresh fuzzy score at or above _CACHE_MIN_SCORE wins outright; below
+        that, an earlier confident pick for `query` is preferred if it's still
+        offered, so the cache never overrides a better option in the list.
+        """
+        match = process.extractOne(query, norms, scorer=scorer, score_cutoff=threshold)
+        if match is not None and match[1] >= _CACHE_MIN_SCORE:
+            return match[2], match[1], False
+        cached = self._cached_pick(field, query, texts)
+        if cached is not None:
+            return texts.index(cached), 100, True
+        return (match[2], match[1], False) if match is not None else None
+
+    @_retry_on_stale()
+    def _click_option_text(self, css: str, text: str) -> bool:
+        """Click the first element matching `css` whose text is `text`."""
+        for option in self.driver.find_elements(By.CSS_SELECTOR, css):
+            if option.text.strip() == text:
+                option.click()
+                return True
+        return False
+
+    def _fast_fill(self, elem, text: str):
+        """Type `text` into an autocomplete input without a round-trip per key.
+
+        All but the last character are set via JS; the last is a real keystroke
+        so the autocomplete sees a keyboard event and opens its panel.
+        """
+        self.driver.execute_script(_FILL_INPUT_JS, elem, text[:-1])
+        if text:
+            elem.send_keys(text[-1])
+
+    def _wait(self, timeout: float = 10, poll: float = 0.1) -> WebDriverWait:
+        """WebDriverWait that polls faster than Selenium's 0.5s default and
+        treats a stale element as 'not ready yet' instead of failing."""
+        return WebDriverWait(self.driver, timeout, poll_frequency=poll,
+                             ignored_exceptions=(StaleElementReferenceException,))
+
+    def _wait_options_ready(self, css: str, min_count: int = 1, timeout: float = 8, poll: float = 0.1):
+        """Return (element, text) for the ready elements matching `css` as soon as
+        `min_count` are shown; the texts come back in the same round-trip.
+
+        Raises TimeoutException if they don't appear within `timeout`.
+        """
+        return self._wait(timeout, poll).until(
+            lambda d: d.execute_script(_READY_OPTIONS_JS, css, min_count) or False
+        )
+
+    def wait_idle(self, timeout: float = 3.0, poll: float = 0.1) -> bool:
+        """Wait until the page and Angular report no pending work.
+
+        Angular's isStable() never turns true on pages with recurring timers or
+        polling, so it only gets a short window; after that the DOM spinner
+        check decides. Once testability has failed several times in a row it
+        is skipped for the rest of the session.
+        """
+        if self._idle_fallbacks < _TESTABILITY_MAX_FALLBACKS:
+            window = min(timeout, _TESTABILITY_TIMEOUT)
+            try:
+                self._wait(window, poll).until(
+                    lambda d: d.execute_script(_PAGE_IDLE_JS)
+                )
+                self._idle_fallbacks = 0
+                return True
+            except TimeoutException:
+                self._idle_fallbacks += 1
+                if self._idle_fallbacks < _TESTABILITY_MAX_FALLBACKS:
+                    print(f"Angular not stable after {window}s; falling back to the spinner check.")
+                else:
+                    print("Angular never reports stable on this page; "
+                          "using only the spinner check from now on.")
+        return _wait_ui_idle(self.driver, timeout, poll)
+
+    def wait_for_ready(self, step: str, timeout: float = 5, poll: float = 0.1) -> bool:
+        # One deadline for the whole step, shared by the idle wait and every
+        # field condition, so the worst case stays `timeout`
+        end = time.monotonic() + timeout
+        self.wait_idle(timeout, poll)
+        try:
+            for condition, locator in _READY_AFTER[step]:
+                self._wait(max(end - time.monotonic(), 0), poll).until(condition(locator))
+            return True
+        except TimeoutException:
+            print(f"[{step}] next field not ready after {timeout}s; continuing.")
+            return False
 
     def split_name(self, name):
-        parts = name.lower().split()
-        return (parts[0], parts[-1]) if len(parts) >= 2 else (parts[0], '')
+        return _split_name(name)
 
     def name_similarity(self, candidate, target):
-        can_first, can_last = self.split_name(candidate)
-        tgt_first, tgt_last = self.split_name(target)
-        last_sim = fuzz.ratio(can_last, tgt_last) / 100.0
-        first_sim = fuzz.ratio(can_first, tgt_first) / 100.0
+        can_first, can_last = _split_name(candidate)
+        tgt_first, tgt_last = _split_name(target)
+        last_sim = cached_indel_similarity(can_last, tgt_last)
+        first_sim = cached_indel_similarity(can_first, tgt_first)
         return 0.8 * last_sim + 0.2 * first_sim
 
     def normalize_name(self, name):
-        cleaned = re.sub(r'[^\w\s]', '', name).lower()
-        words = cleaned.split()
-        words.sort()
-        return ' '.join(words)
-
-    def click_patient_row_with_retries(driver, idx, expected_text, retries=3, sleep=0.2):
-        css = ".go-search-dropdown.patient-drop-down mat-list-item.mat-list-item"
-        last_exc = None
-        for _ in range(retries):
-            try:
-                rows = driver.find_elements(By.CSS_SELECTOR, css)
-                if not rows:
-                    time.sleep(sleep)
-                    continue
-                elem = rows[idx] if idx < len(rows) else None
-                if elem is None:
-                    elem = next((r for r in rows if expected_text.lower() in r.text.lower()), None)
-                    if elem is None:
-                        time.sleep(sleep)
-                        continue
-                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", elem)
-                try:
-                    elem.click()
-                except Exception:
-                    driver.execute_script("arguments[0].click();", elem)
-                return True
-            except StaleElementReferenceException as e:
-                last_exc = e
-                time.sleep(sleep)
-                continue
-            except Exception as e:
-                last_exc = e
-                time.sleep(sleep)
-                continue
-        print(f"Failed to click patient after {retries} retries. Last error: {last_exc}")
-        return False
+        return _normalize_name(name)
 
+    @_ready_after("patient")
     def select_patient(self, date_of_birth, patient_name) -> bool:
         try:
-            search_input = WebDriverWait(self.driver, 10).until(
+            search_input = self._wait(10).until(
                 EC.presence_of_element_located((By.ID, "docSavePatName"))
             )
         except TimeoutException:
@@ -132,11 +353,10 @@ class TalkEHRBot:
             search_query = date_of_birth if date_of_birth else patient_name
             search_input.send_keys(search_query)
             search_input.send_keys(Keys.ENTER)
-
-            time.sleep(5)
-
-            result_list = WebDriverWait(self.driver, 30).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, ".go-search-dropdown.patient-drop-down"))
+            # Let the search request settle, then go as soon as rows render
+            self.wait_idle(timeout=10)
+            self._wait_options_ready(
+                ".go-search-dropdown.patient-drop-down mat-list-item.mat-list-item", timeout=30
             )
         except TimeoutException:
             print("Patient dropdown never appeared.")
@@ -145,82 +365,50 @@ class TalkEHRBot:
             print(f"Unexpected error while searching patient: {e}")
             return False
         try:
-            patients = result_list.find_elements(By.CSS_SELECTOR, "mat-list-item.mat-list-item")
-        except StaleElementReferenceException:
-            patients = self.driver.find_elements(
-                By.CSS_SELECTOR,
-                ".go-search-dropdown.patient-drop-down mat-list-item.mat-list-item"
-            )
+            # Name and MRN of every row in one round-trip; elements are
+            # only touched again to click the chosen row
+            rows = self.driver.execute_script(_PATIENT_ROWS_JS) or []
+        except Exception as e:
+            print(f"Could not read patient rows: {e}")
+            return False
 
-        if not patients:
+        if not rows:
             print("No patients returned.")
             return False
 
         target_full = patient_name
-        if len(patients) == 1:
-            try:
-                lines = patients[0].text.split('\n')
-                name = lines[0].strip() if lines else ""
-                ok, score, why = strong_enough_match(target_full, name)
-                print(f"Comparing '{name}' vs '{patient_name}' — {score:.3f} ({why})")
-                if ok:
-                    return click_patient_row_with_retries(self.driver, 0, name, retries=3)
-                else:
-                    print(f"Single result found but not strong enough: '{name}' (expected '{patient_name}')")
-                    return False
-            except Exception as e:
-                print(f"Failed handling single patient result: {e}")
-                return False
-
-        print(f"{len(patients)} results found. Listing info and similarities:")
-        fresh_rows = self.driver.find_elements(
-            By.CSS_SELECTOR, ".go-search-dropdown.patient-drop-down mat-list-item.mat-list-item"
-        )
-        mrn_pattern = re.compile(r"MRN:(\d+)")
-        best_idx = None
-        best_reason = ""
-        best_score = -1.0
-        chosen_name = ""
-        chosen_mrn = 0
-
-        for i, pat in enumerate(fresh_rows):
-            try:
-                lines = pat.text.split('\n')
-                if not lines:
-                    continue
-                name = lines[0].strip()
-                ok, score, why = strong_enough_match(target_full, name)
-                print(f"    Candidate: '{name}' — {score:.3f} ({why})")
-
-                mrn_match = mrn_pattern.search(pat.text)
-                mrn = int(mrn_match.group(1)) if mrn_match else 0
-                if ok:
-                    if score > best_score or (abs(score - best_score) < 1e-9 and mrn < chosen_mrn):
-                        best_idx = i
-                        best_score = score
-                        best_reason = why
-                        chosen_name = name
-                        chosen_mrn = mrn
-
-            except StaleElementReferenceException:
-                print("A patient row went stale; skipping.")
-                continue
-            except Exception as e:
-                print(f"Error parsing patient row: {e}")
-                continue
+        if len(rows) == 1:
+            name = rows[0]["name"]
+            ok, score, why = strong_enough_match(target_full, name)
+            print(f"Comparing '{name}' vs '{patient_name}' — {score:.3f} ({why})")
+            if ok:
+                return click_patient_row_with_retries(self.driver, 0, name, retries=3)
+            print(f"Single result found but not strong enough: '{name}' (expected '{patient_name}')")
+            return False
 
-        if best_idx is not None:
+        print(f"{len(rows)} results found. Listing info and similarities:")
+        names = [sys.intern(row["name"]) for row in rows]
+        mrns = [row["mrn"] for row in rows]
+        for name, mrn in zip(names, mrns):
+            print(f"    Candidate: '{name}' (MRN: {mrn})")
+
+        # Score every candidate in one batch; equal scores go to the lower MRN
+        match = best_match(target_full, names, tiebreak=mrns)
+        if match is not None:
+            j, best_score, best_reason = match
+            chosen_name, chosen_mrn = names[j], mrns[j]
             print(f"Selecting '{chosen_name}' (MRN: {chosen_mrn}) with score {best_score:.3f} ({best_reason})")
-            ok = click_patient_row_with_retries(self.driver, best_idx, chosen_name, retries=3)
+            ok = click_patient_row_with_retries(self.driver, j, chosen_name, retries=3)
             if ok:
                 return True
             print("Retry click failed.")
             return False
 
         print("No close name match found.")
-        print("Available names:", [fr.text.split("\n")[0].strip() for fr in fresh_rows if fr.text])
+        print("Available names:", names)
         return False
 
+    @_ready_after("doc_type")
     def select_doc_type(
             self,
             doc_type: str,
@@ -231,14 +419,12 @@ class TalkEHRBot:
     ) -> bool:
         start = time.time()
         try:
-            doc_type_input = WebDriverWait(self.driver, 10).until(
+            doc_type_input = self._wait(10).until(
                 EC.element_to_be_clickable((By.ID, "txtdocType"))
             )
-            doc_type_input.clear()
-            for ch in doc_type:
-                doc_type_input.send_keys(ch)
-                time.sleep(0.05)
-            time.sleep(3)
+            self._fast_fill(doc_type_input, doc_type)
+            # Options for the typed text are final once the lookup has returned
+            self.wait_idle()
         except Exception as e:
             print(f"[doc_type] Could not type into input: {e}")
             return False
@@ -251,20 +437,28 @@ class TalkEHRBot:
                 break
             time.sleep(poll)
         target_norm = self.normalize_name(doc_type)
-        best_text, best_score = None, 0
-        for _, text_raw in opts:
-            text_norm = self.normalize_name(text_raw)
-            if target_norm in text_norm or text_norm in target_norm:
-                if _click_option_by_text(self.driver, text_raw):
-                    print(f"Selected doc type (substring/equality): {text_raw}")
-                    return True
-            score = fuzz.token_set_ratio(target_norm, text_norm)
-            print(f"   – '{text_raw}' -> {score}")
-            if score > best_score:
-                best_score, best_text = score, text_raw
-        if best_text and best_score >= threshold:
+        texts = [text_raw for _, text_raw in opts]
+        norms = [self.normalize_name(t) for t in texts]
+        # Exact, then whole-word containment, before any fuzzy scoring
+        hit = exact_or_substring(target_norm, norms)
+        if hit is not None and _click_option_by_text(self.driver, texts[hit]):
+            print(f"Selected doc type (exact/contains): {texts[hit]}")
+            return True
+        # One C call; options that can't reach the threshold are pruned and the
+        # scan stops at a perfect 100. Ties keep the first in dropdown order.
+        match = self._fuzzy_or_cached("doc_type", target_norm, texts, norms,
+                                      fuzz.token_set_ratio, threshold)
+        if match is None:
+            print(f"   no option scored >= {threshold}: {texts}")
+        else:
+            idx, best_score, cached = match
+            best_text = texts[idx]
             if _click_option_by_text(self.driver, best_text):
-                print(f"Selected doc type (fuzzy {best_score}): {best_text}")
+                if cached:
+                    print(f"Selected doc type (cached): {best_text}")
+                else:
+                    print(f"Selected doc type (fuzzy {best_score:.0f}): {best_text}")
+                    self._remember_pick("doc_type", target_norm, best_text, best_score)
                 return True
             else:
                 print("[doc_type] Best option went stale or could not be clicked even after retries.")
@@ -278,103 +472,102 @@ class TalkEHRBot:
         print(f"No matching doc type found for '{doc_type}'.")
         return False
 
+    @_ready_after("sub_type")
     def select_doc_sub_type(self, doc_sub_type):
-        sub_type_input = WebDriverWait(self.driver, 10).until(
+        sub_type_input = self._wait(10).until(
             EC.element_to_be_clickable((By.ID, "txtdocSubType"))
         )
-        sub_type_input.clear()
-        for char in doc_sub_type[:5]:
-            sub_type_input.send_keys(char)
-            time.sleep(0.1)
+        self._fast_fill(sub_type_input, doc_sub_type[:5])
         try:
-            dropdown_options = WebDriverWait(self.driver, 10).until(
+            dropdown_options = self._wait(10).until(
                 EC.visibility_of_all_elements_located((By.CSS_SELECTOR, "mat-option"))
             )
         except Exception as e:
             print(f"Subtype dropdown didn't appear: {e}")
             return False
 
-        option_texts = [option.text.strip() for option in dropdown_options if option.text.strip()]
+        option_texts = [sys.intern(t) for t in (option.text.strip() for option in dropdown_options) if t]
         if not option_texts:
             print("No options found in the dropdown.")
             return False
-        match = process.extractOne(
-            doc_sub_type, option_texts, scorer=fuzz.token_sort_ratio
-        )
-        if match:
-            best_text, score, idx = match
-            print(f"Selected top match: '{best_text}' (score: {score})")
-            for option in dropdown_options:
-                if option.text.strip() == best_text:
-                    option.click()
-                    return True
-            return None
+        query = self.normalize_name(doc_sub_type)
+        # Options are normalized once (lower-cased, punctuation stripped);
+        # token_sort_ratio keeps the match insensitive to word order
+        norms = [self.normalize_name(t) for t in option_texts]
+        fuzzy = query not in norms
+        if not fuzzy:
+            best_text = option_texts[norms.index(query)]
+            print(f"Selected exact match: '{best_text}'")
         else:
-            print(f"No options available to match for '{doc_sub_type}'.")
-            return False
+            match = self._fuzzy_or_cached("doc_sub_type", query, option_texts, norms, fuzz.token_sort_ratio)
+            if not match:
+                print(f"No options available to match for '{doc_sub_type}'.")
+                return False
+            idx, score, cached = match
+            best_text = option_texts[idx]
+            if cached:
+                fuzzy = False
+                print(f"Selected cached match: '{best_text}'")
+            else:
+                print(f"Selected top match: '{best_text}' (score: {score:.0f})")
+        if self._click_option_text("mat-option", best_text):
+            if fuzzy:
+                self._remember_pick("doc_sub_type", query, best_text, score)
+            return True
+        return None
 
+    @_ready_after("assigned_to")
     def select_assigned_to(self, assigned_to: str, fallback: str = "Asim Ali",
                            threshold: int = 80) -> bool:
         def _type_and_pick(target: str) -> bool:
             label_xpath = "//mat-label[contains(text(),'Assigned To')]/ancestor::label"
             try:
-                label_el = WebDriverWait(self.driver, 10).until(
+                label_el = self._wait(10).until(
                     EC.presence_of_element_located((By.XPATH, label_xpath))
                 )
                 input_id = label_el.get_attribute("for")
-                assigned_input = WebDriverWait(self.driver, 10).until(
+                assigned_input = self._wait(10).until(
                     EC.element_to_be_clickable((By.ID, input_id))
                 )
             except Exception as e:
                 print(f"Unable to locate 'Assigned To' input: {e}")
                 return False
             try:
-                assigned_input.clear()
-
-                for ch in target[:3]:
-                    assigned_input.send_keys(ch)
-                    time.sleep(0.08)
-                time.sleep(3)
+                self._fast_fill(assigned_input, target[:3])
+                self.wait_idle()
                 try:
-                    options = WebDriverWait(self.driver, 7).until(
-                        EC.visibility_of_all_elements_located(
-                            (By.CSS_SELECTOR, ".cdk-overlay-pane mat-option")
-                        )
-                    )
+                    options = self._wait_options_ready(".cdk-overlay-pane mat-option", timeout=7)
                 except TimeoutException:
                     print(f"'Assigned To' dropdown didn't appear for '{target}'.")
                     return False
                 target_norm = self.normalize_name(target)
-                best_score = 0
-                best_option = None
-                for option in options:
-                    try:
-                        text = option.text.strip()
-                    except StaleElementReferenceException:
-                        continue
-                    text_norm = self.normalize_name(text)
-                    score = fuzz.token_set_ratio(target_norm, text_norm)
-                    print(f"Comparing '{target}' <-> '{text}': {score}")
-                    if score > best_score:
-                        best_score = score
-                        best_option = option
-                if best_option and best_score >= threshold:
-                    selected_text = best_option.text.strip()
+                live = [option for option, _ in options]
+                texts = [sys.intern(text) for _, text in options]
+                norms = [self.normalize_name(t) for t in texts]
+                hit = exact_or_substring(target_norm, norms)
+                fuzzy = hit is None
+                if fuzzy:
+                    match = self._fuzzy_or_cached("assigned_to", target_norm, texts, norms,
+                                                  fuzz.token_set_ratio, threshold)
+                    fuzzy = match is not None and not match[2]
+                else:
+                    match = (hit, 100, False)
+                if match is not None:
+                    best_score, best_option = match[1], live[match[0]]
+                    selected_text = texts[match[0]]
                     try:
                         best_option.click()
                     except StaleElementReferenceException:
                         try:
-                            all_opts = self.driver.find_elements(By.CSS_SELECTOR, ".cdk-overlay-pane mat-option")
-                            for o in all_opts:
-                                if o.text.strip() == selected_text:
-                                    o.click()
-                                    break
+                            self._click_option_text(".cdk-overlay-pane mat-option", selected_text)
                         except Exception as e:
                             print(f"Retry click failed: {e}")
                             return False
-                    print(f"Selected 'Assigned To' (fuzzy): {selected_text} (score {best_score})")
+                    print(f"Selected 'Assigned To': {selected_text} (score {best_score:.0f})")
+                    if fuzzy:
+                        self._remember_pick("assigned_to", target_norm, selected_text, best_score)
                     return True
-                print(f"No fuzzy match for '{target}'. Options were: {[o.text for o in options]}")
+                print(f"No fuzzy match for '{target}'. Options were: {texts}")
                 return False
             except Exception as e:
                 print(f"Unexpected error in _type_and_pick('{target}'): {e}")
@@ -385,18 +578,37 @@ class TalkEHRBot:
         return _type_and_pick(fallback)
 
     def switch_to_talker_tab(self):
+        # Still on the talkEHR tab found last time? One script call; a closed
+        # tab raises NoSuchWindowException and we fall through to a full scan.
+        if self._talker_handle is not None:
+            try:
+                if _is_talker(*self.driver.execute_script(_TAB_INFO_JS)):
+                    return True
+            except NoSuchWindowException:
+                pass
+        # Switch unconditionally: the attached tab may have been closed, and then
+        # even reading current_window_handle raises NoSuchWindowException.
+        # switch_to.window returns once the switch is committed, so no settle sleep.
         for handle in self.driver.window_handles:
-            self.driver.switch_to.window(handle)
-            time.sleep(1)
-            if "talkehr" in self.driver.title.lower() or "talkehr" in self.driver.current_url.lower():
+            try:
+                self.driver.switch_to.window(handle)
+                title, url = self.driver.execute_script(_TAB_INFO_JS)
+            except NoSuchWindowException:
+                continue
+            if _is_talker(title, url):
+                if handle != self._talker_handle:
+                    self._drop_cdp()  # bound to the tab we left
+                    self._talker_handle = handle
                 print("Switched to talkEHR tab!")
                 return True
+        self._drop_cdp()
+        self._talker_handle = None
         print("talkEHR tab not found.")
         return False
 
     def add_comments(self, comments):
         try:
-            comments_input = WebDriverWait(self.driver, 10).until(
+            comments_input = self._wait(10, poll=0.05).until(
                 EC.element_to_be_clickable((By.ID, "txtComments"))
             )
             comments_input.clear()
@@ -413,15 +625,19 @@ class TalkEHRBot:
             return None
 
         try:
-            iframe = self.driver.find_element(By.ID, "docIframeView")
-            link = iframe.get_attribute("src")
-            if link:
-                print("IFRAME LINK:", link)
-                return link
-            else:
-                print("No link found in iframe, checking table for unread rows...")
+            # One read for both the open viewer and the unread count
+            state = self.evaluate(_INBOX_STATE_JS) or {}
         except Exception as e:
-            print(f"Iframe not found immediately: {e}. Checking table for unread rows...")
+            print(f"Could not read inbox state: {e}")
+            return None
+        link = state.get("src")
+        if link:
+            print("IFRAME LINK:", link)
+            return link
+        print("No link found in iframe, checking table for unread rows...")
+        if not state.get("unread"):
+            print("No unread rows found.")
+            return None
 
         try:
             table = self.driver.find_element(By.CSS_SELECTOR, 'table.mat-table')
@@ -434,7 +650,7 @@ class TalkEHRBot:
                 view_link = first_row.find_element(By.XPATH, ".//a[contains(text(), 'View')]")
                 view_link.click()
                 print("Clicked 'View'. Waiting for modal and iframe...")
-                wait = WebDriverWait(self.driver, 15)
+                wait = self._wait(15)
                 iframe = wait.until(
                     EC.presence_of_element_located((By.ID, "docIframeView"))
                 )
@@ -446,15 +662,42 @@ class TalkEHRBot:
             return None
 
     def save_button(self):
-        save_button = WebDriverWait(self.driver, 10).until(
+        save_button = self._wait(10, poll=0.05).until(
             EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Save']]"))
         )
+        # Remember what the open fax looks like so wait_after_save can spot it closing
+        views = self.driver.find_elements(By.ID, "docIframeView")
+        self._saved_view = views[0] if views else None
+        self._url_before_save = self.driver.current_url
         save_button.click()
         print("Save button clicked.")
 
+    def wait_after_save(self, timeout: float = 5) -> bool:
+        """Return as soon as the saved fax's viewer closes or the page navigates."""
+        view = getattr(self, "_saved_view", None)
+        url_before = getattr(self, "_url_before_save", None)
+
+        def _saved(driver):
+            if view is not None:
+                try:
+                    if not view.is_displayed():
+                        return True
+                except StaleElementReferenceException:
+                    return True
+            return url_before is not None and driver.current_url != url_before
+
+        try:
+            self._wait(timeout, poll=0.3).until(_saved)
+            # The save itself may still be spinning after the viewer closes
+            _wait_ui_idle(self.driver, timeout)
+            return True
+        except TimeoutException:
+            print(f"Save not confirmed within {timeout}s; continuing.")
+            return False
+
 
     def cancel_button(self):
-        btn = WebDriverWait(self.driver, 10).until(
+        btn = self._wait(10, poll=0.05).until(
             EC.element_to_be_clickable((By.XPATH, "//button[.//span[normalize-space()='Cancel']]"))
         )
         btn.click()
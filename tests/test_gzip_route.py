@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from backend.gzip_route import MAX_DECOMPRESSED_BYTES, GzipRoute, _gunzip_capped
+
+
+class EchoBody(BaseModel):
+    text: str
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.router.route_class = GzipRoute
+
+    @app.post("/echo")
+    async def echo(body: EchoBody):
+        return {"text": body.text}
+
+    @app.post("/size")
+    async def size(request: Request):
+        return {"size": len(await request.body())}
+
+    return TestClient(app)
+
+
+def _post_gzip(client, path, body):
+    return client.post(path, content=body,
+                       headers={"Content-Encoding": "gzip", "Content-Type": "application/json"})
+
+
+def test_valid_gzip_body_is_parsed(client):
+    r = _post_gzip(client, "/echo", gzip.compress(b'{"text": "fax"}'))
+    assert r.status_code == 200
+    assert r.json() == {"text": "fax"}
+
+
+def test_plain_body_is_untouched(client):
+    r = client.post("/echo", json={"text": "fax"})
+    assert r.status_code == 200
+    assert r.json() == {"text": "fax"}
+
+
+def test_corrupt_body_is_400(client):
+    r = _post_gzip(client, "/echo", b"not gzip at all")
+    assert r.status_code == 400
+
+
+def test_truncated_stream_is_400(client):
+    r = _post_gzip(client, "/echo", gzip.compress(b'{"text": "fax"}')[:-6])
+    assert r.status_code == 400
+    assert "truncated" in r.json()["detail"]
+
+
+def test_body_inflating_past_the_cap_is_413(client):
+    # A few KB on the wire, just over the cap once inflated
+    r = _post_gzip(client, "/size", gzip.compress(b"\0" * (MAX_DECOMPRESSED_BYTES + 1)))
+    assert r.status_code == 413
+
+
+def test_body_of_exactly_the_cap_is_accepted():
+    assert _gunzip_capped(gzip.compress(b"a" * 1000), limit=1000) == b"a" * 1000
+
+
+def test_output_held_back_at_the_cap_is_413():
+    # All input consumed but zlib still holds output at the cap: oversize, not truncation
+    with pytest.raises(HTTPException) as exc:
+        _gunzip_capped(gzip.compress(b"\0" * 1000)[:-9], limit=999)
+    assert exc.value.status_code == 413
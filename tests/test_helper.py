@@ -0,0 +1,51 @@
+from frontend.helper import best_match, exact_or_substring
+
+
+def test_exact_option_beats_one_containing_it():
+    norms = ["medical records request", "medical records"]
+    assert exact_or_substring("medical records", norms) == 1
+
+
+def test_containing_option_with_fewest_extra_words_wins():
+    norms = ["old medical records request", "medical records request"]
+    assert exact_or_substring("medical records", norms) == 1
+
+
+def test_partial_words_do_not_count_as_contained():
+    assert exact_or_substring("ann lee", ["joann leeds"]) is None
+    assert exact_or_substring("lab", ["laboratory results"]) is None
+
+
+def test_short_option_inside_the_target_is_left_to_fuzzy():
+    # "ali" used to match any target containing those letters
+    assert exact_or_substring("ali hassan", ["ali"]) is None
+    assert exact_or_substring("asim ali", ["ali", "asim ali khan"]) == 1
+
+
+def test_empty_target_needs_fuzzy():
+    assert exact_or_substring("", ["", "anything"]) is None
+
+
+def test_exact_name_wins_over_fuzzy_perfect_score():
+    # token_set_ratio scores "jane b doe" 100 too, but the verbatim name comes first
+    match = best_match("Jane Doe", ["Jane B Doe", "Jane Doe"], tiebreak=["00001", "00002"])
+    assert match == (1, 1.0, "exact match")
+
+
+def test_exact_duplicates_go_to_the_lower_mrn():
+    match = best_match("Jane Doe", ["Jane Doe", "jane doe"], tiebreak=["00200", "00100"])
+    assert match[0] == 1
+
+
+def test_equal_fuzzy_scores_go_to_the_lower_mrn():
+    match = best_match("Jane Doe", ["Jane B Doe", "Jane C Doe"], tiebreak=["00200", "00100"])
+    assert match is not None
+    assert match[0] == 1
+
+
+def test_ties_keep_list_order_without_tiebreak():
+    assert best_match("Jane Doe", ["Jane B Doe", "Jane C Doe"])[0] == 0
+
+
+def test_unrelated_name_is_rejected():
+    assert best_match("Jane Doe", ["Robert Smith"]) is None
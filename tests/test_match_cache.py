@@ -0,0 +1,65 @@
+import itertools
+import sqlite3
+import types
+
+import pytest
+
+from frontend import match_cache
+from frontend.match_cache import MatchCache, open_match_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Strictly increasing timestamps so LRU order never depends on timer resolution
+    ticks = itertools.count(1)
+    monkeypatch.setattr(match_cache, "time", types.SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+def test_get_put_round_trip(tmp_path, clock):
+    cache = MatchCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("doc_type", "lab results") is None
+    cache.put("doc_type", "lab results", "Lab Results")
+    assert cache.get("doc_type", "lab results") == "Lab Results"
+    # Fields are separate namespaces, and a put overwrites the old answer
+    assert cache.get("assigned_to", "lab results") is None
+    cache.put("doc_type", "lab results", "Laboratory Results")
+    assert cache.get("doc_type", "lab results") == "Laboratory Results"
+    cache.close()
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = MatchCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("f", "a", "A")
+    cache.put("f", "b", "B")
+    assert cache.get("f", "a") == "A"  # a is now used more recently than b
+    cache.put("f", "c", "C")
+    assert cache.get("f", "b") is None
+    assert cache.get("f", "a") == "A"
+    assert cache.get("f", "c") == "C"
+    cache.close()
+
+
+def test_survives_reopen(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = MatchCache(path)
+    cache.put("doc_sub_type", "radiology", "Radiology Report")
+    cache.close()
+    cache = MatchCache(path)
+    assert cache.get("doc_sub_type", "radiology") == "Radiology Report"
+    cache.close()
+
+
+def test_drops_the_old_matches_table(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE matches (field TEXT, query TEXT, answer TEXT, used REAL)")
+    conn.execute("INSERT INTO matches VALUES ('f', 'q', 'weak pick', 1)")
+    conn.commit()
+    conn.close()
+    cache = MatchCache(path)
+    assert cache.get("f", "q") is None
+    cache.close()
+
+
+def test_open_match_cache_returns_none_when_unusable(tmp_path):
+    assert open_match_cache(str(tmp_path)) is None  # a directory, not a database file
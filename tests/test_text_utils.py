@@ -0,0 +1,30 @@
+from backend.text_utils import canonicalize
+
+
+def test_drops_page_marker_lines():
+    text = "Referral\nPage 2\nPatient: Jane Doe\npage 3 of 5\n- 4 -\nPage 5/5\nEnd"
+    assert canonicalize(text) == "Referral\n\nPatient: Jane Doe\n\nEnd"
+
+
+def test_keeps_content_lines_that_mention_a_page():
+    text = "See Page 2 of the report\nPage 2 of the report follows"
+    assert canonicalize(text) == text
+
+
+def test_unifies_line_endings():
+    assert canonicalize("a\r\nb\rc\n") == "a\nb\nc"
+
+
+def test_applies_nfkc():
+    # Ligature, full-width digits and a no-break space fold to plain text
+    assert canonicalize("\ufb01le \uff11\uff12\u00a0pages") == "file 12 pages"
+
+
+def test_collapses_spaces_and_blank_lines():
+    assert canonicalize("  a \t b\n\n\n\n\nc  ") == "a b\n\nc"
+
+
+def test_trivially_different_copies_match():
+    a = "Fax from Dr. Smith\r\n\r\nPage 1 of 2\r\nLab results\r\n"
+    b = "Fax  from Dr. Smith\n\nLab results"
+    assert canonicalize(a) == canonicalize(b)